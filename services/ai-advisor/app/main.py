@@ -7,6 +7,7 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
 # Add services directory to path
 # Add services directory to path
@@ -24,7 +25,7 @@ if str(CURRENT_DIR) not in sys.path:
 
 from python_shared.graceful_shutdown import GracefulShutdownManager
 from python_shared.health import HealthCheckResult, HealthReporter
-from python_shared.metrics import MetricsMiddleware, MetricsRecorder
+from python_shared.metrics import OPENMETRICS_CONTENT_TYPE, MetricsMiddleware, MetricsRecorder
 from python_shared.rate_limit import RateLimitConfig, RateLimitMiddleware, RateLimiter
 from python_shared.tracing import TraceMiddleware
 
@@ -177,6 +178,12 @@ async def metrics_endpoint():
     return metrics_recorder.snapshot()
 
 
+@app.get("/api/metrics/openmetrics", include_in_schema=False)
+async def openmetrics_endpoint():
+    """Metrics in the OpenMetrics text format for Prometheus scrapes."""
+    return Response(metrics_recorder.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+
 @app.get("/api/usage")
 async def usage_endpoint():
     """Usage statistics endpoint (COST-003)."""
@@ -186,7 +193,8 @@ async def usage_endpoint():
 
 @shutdown_manager.callback
 def _log_shutdown_metrics() -> None:
-    """Log metrics on shutdown."""
+    """Stop the metrics flusher and log the final snapshot."""
+    metrics_recorder.close()
     logger.info("ai-advisor metrics snapshot", extra={"metrics": metrics_recorder.snapshot()})
 
 
@@ -10,6 +10,8 @@ if SERVICES_DIR.exists() and str(SERVICES_DIR) not in sys.path:
     sys.path.insert(0, str(SERVICES_DIR))
 
 from python_shared.cache import AsyncTTLCache, CacheConfig
+from python_shared.config import parse_float, parse_int
+from python_shared.redis_cache import RedisCacheTier, create_serializer
 from python_shared.metrics import MetricsRecorder
 from app.services.database import AnalyticsDatabase
 from app.services.realtime import RealtimeMetricsBroadcaster
@@ -37,8 +39,27 @@ cache_config = CacheConfig(
     namespace="analytics",
     default_ttl_seconds=float(_seconds_from_env("ANALYTICS_CACHE_DEFAULT_TTL_SECONDS", 30)),
     max_entries=_int_from_env("ANALYTICS_CACHE_MAX_ENTRIES", 512),
+    # Budget for the summed JSON size of cached payloads (0 disables).
+    max_bytes=max(0, parse_int(os.getenv("ANALYTICS_CACHE_MAX_BYTES"), 64 * 1024 * 1024)),
+    # Serve expired dashboard data for this long while one background reload runs.
+    stale_ttl_seconds=max(0.0, parse_float(os.getenv("ANALYTICS_CACHE_STALE_TTL_SECONDS"), 60.0)),
+    # Keys read this often within their TTL are reloaded before they expire (0 disables).
+    refresh_ahead_hits=max(0, parse_int(os.getenv("ANALYTICS_CACHE_REFRESH_AHEAD_HITS"), 20)),
 )
-analytics_cache = AsyncTTLCache(cache_config)
+# Optional Redis L2 shared by all replicas; empty URL keeps the cache in-process only.
+ANALYTICS_REDIS_URL = os.getenv("ANALYTICS_REDIS_URL", "").strip()
+cache_l2 = (
+    RedisCacheTier(
+        ANALYTICS_REDIS_URL,
+        namespace=cache_config.namespace,
+        serializer=create_serializer(os.getenv("ANALYTICS_CACHE_SERIALIZER", "json"), logger=LOGGER),
+        logger=LOGGER,
+        metrics=metrics_recorder,
+    )
+    if ANALYTICS_REDIS_URL
+    else None
+)
+analytics_cache = AsyncTTLCache(cache_config, metrics=metrics_recorder, logger=LOGGER, l2=cache_l2)
 
 # Realtime config
 REALTIME_UPDATE_INTERVAL_SECONDS = float(
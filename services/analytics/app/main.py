@@ -24,6 +24,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.globals import (
+    analytics_cache,
     database,
     metrics_recorder,
     realtime_broadcaster,
@@ -71,16 +72,19 @@ app.include_router(analytics.router)
 @app.on_event("startup")
 async def _connect_database() -> None:
     await database.connect()
+    await analytics_cache.start()
     realtime_broadcaster.start()
 
 @shutdown_manager.callback
 def _log_shutdown_metrics() -> None:
+    metrics_recorder.close()
     LOGGER.info("analytics metrics snapshot", extra={"metrics": metrics_recorder.snapshot()})
 
 @shutdown_manager.callback
 async def _close_database() -> None:
     await database.disconnect()
     await realtime_broadcaster.stop()
+    await analytics_cache.close()
 
 
 if __name__ == "__main__":
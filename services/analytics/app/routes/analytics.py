@@ -54,6 +54,7 @@ from app.utils.helpers import (
     _cycle_colors,
     _completion_percentage,
 )
+from python_shared.metrics import OPENMETRICS_CONTENT_TYPE
 
 router = APIRouter()
 
@@ -62,23 +63,11 @@ async def _load_with_cache(
     *,
     key: str,
     ttl_seconds: float,
-    metric: str,
     loader: Callable[[], Any],
 ) -> Dict[str, object]:
-    cached = await analytics_cache.get(key)
-    if cached is not None:
-        metrics_recorder.increment_counter(f"{metric}.cache_hit")
-        return cached
-
-    async def _loader() -> Dict[str, object]:
-        metrics_recorder.increment_counter(f"{metric}.cache_miss")
-        return await loader()
-
-    return await analytics_cache.remember(
-        key,
-        _loader,
-        ttl_seconds=ttl_seconds,
-    )
+    # remember() also serves stale values and schedules background refreshes;
+    # hits, misses and loader latency are reported by the cache per key prefix.
+    return await analytics_cache.remember(key, loader, ttl_seconds=ttl_seconds)
 
 
 async def _generate_visualization_chart(
@@ -204,6 +193,8 @@ async def refresh_analytics() -> Dict[str, str]:
     started = time.perf_counter()
     try:
         await database.refresh_views()
+        # Cached results were computed from the old views; clear them on every replica.
+        await analytics_cache.clear()
         metrics_recorder.observe_operation(
             "refresh_views",
             duration_ms=(time.perf_counter() - started) * 1000,
@@ -239,7 +230,6 @@ async def get_stats(userId: str) -> StatsResponse:
         payload = await _load_with_cache(
             key=f"stats:profile:{profile_id}",
             ttl_seconds=PROFILE_STATS_CACHE_TTL,
-            metric="stats.profile",
             loader=_loader,
         )
         response = StatsResponse(**payload)
@@ -248,7 +238,6 @@ async def get_stats(userId: str) -> StatsResponse:
             "fetch_stats",
             duration_ms=(time.perf_counter() - started) * 1000,
             success=True,
-            metadata={"userId": userId},
         )
         return response
     except HTTPException:
@@ -257,7 +246,6 @@ async def get_stats(userId: str) -> StatsResponse:
             duration_ms=(time.perf_counter() - started) * 1000,
             success=False,
             error="validation_error",
-            metadata={"userId": userId},
         )
         raise
     except Exception as exc:
@@ -266,7 +254,6 @@ async def get_stats(userId: str) -> StatsResponse:
             duration_ms=(time.perf_counter() - started) * 1000,
             success=False,
             error=str(exc),
-            metadata={"userId": userId},
         )
         raise
 
@@ -277,32 +264,25 @@ async def get_batch_profile_stats(payload: BatchStatsRequest) -> BatchStatsRespo
     unique_ids = payload.profileIds[:BATCH_PROFILE_LIMIT]
     results: Dict[str, StatsResponse] = {}
     missing: List[UUID] = []
-    cache_hits = 0
 
+    # One L2 round trip for the lookups and one for the writes, not one per profile.
+    cached = await analytics_cache.get_many([f"stats:profile:{profile_id}" for profile_id in unique_ids])
     for profile_id in unique_ids:
-        cached = await analytics_cache.get(f"stats:profile:{profile_id}")
-        if cached is not None:
-            cache_hits += 1
-            results[str(profile_id)] = StatsResponse(**cached)
+        payload_stats = cached.get(f"stats:profile:{profile_id}")
+        if payload_stats is not None:
+            results[str(profile_id)] = StatsResponse(**payload_stats)
         else:
             missing.append(profile_id)
 
-    if cache_hits:
-        metrics_recorder.increment_counter(
-            "stats.profile.batch.cache_hit", value=float(cache_hits)
-        )
-
     if missing:
-        metrics_recorder.increment_counter(
-            "stats.profile.batch.cache_miss", value=float(len(missing))
-        )
         batch_payload = await database.fetch_profile_stats_batch(missing)
+        loaded = {
+            f"stats:profile:{profile_id}": batch_payload.get(profile_id, _empty_profile_stats())
+            for profile_id in missing
+        }
+        await analytics_cache.set_many(loaded, ttl_seconds=PROFILE_STATS_CACHE_TTL)
         for profile_id in missing:
-            stats = batch_payload.get(profile_id, _empty_profile_stats())
-            await analytics_cache.set(
-                f"stats:profile:{profile_id}", stats, ttl_seconds=PROFILE_STATS_CACHE_TTL
-            )
-            results[str(profile_id)] = StatsResponse(**stats)
+            results[str(profile_id)] = StatsResponse(**loaded[f"stats:profile:{profile_id}"])
 
     metrics_recorder.observe_operation(
         "fetch_profile_stats_batch",
@@ -333,7 +313,6 @@ async def get_aggregate_metrics() -> AggregateResponse:
         payload = await _load_with_cache(
             key="aggregate:platform",
             ttl_seconds=AGGREGATE_CACHE_TTL,
-            metric="aggregate",
             loader=_loader,
         )
         metrics_recorder.increment_counter("aggregate.generated")
@@ -368,7 +347,6 @@ async def get_profile_trends(userId: str) -> ProfileTrendResponse:
         payload = await _load_with_cache(
             key=f"trends:profile:{profile_id}",
             ttl_seconds=TREND_CACHE_TTL,
-            metric="trends.profile",
             loader=_loader,
         )
         metrics_recorder.increment_counter("trends.profile.generated")
@@ -376,7 +354,6 @@ async def get_profile_trends(userId: str) -> ProfileTrendResponse:
             "fetch_profile_trends",
             duration_ms=(time.perf_counter() - started) * 1000,
             success=True,
-            metadata={"userId": userId},
         )
         return ProfileTrendResponse(**payload)
     except HTTPException:
@@ -385,7 +362,6 @@ async def get_profile_trends(userId: str) -> ProfileTrendResponse:
             duration_ms=(time.perf_counter() - started) * 1000,
             success=False,
             error="validation_error",
-            metadata={"userId": userId},
         )
         raise
     except Exception as exc:
@@ -394,7 +370,6 @@ async def get_profile_trends(userId: str) -> ProfileTrendResponse:
             duration_ms=(time.perf_counter() - started) * 1000,
             success=False,
             error=str(exc),
-            metadata={"userId": userId},
         )
         raise
 
@@ -409,7 +384,6 @@ async def get_platform_trends() -> PlatformTrendResponse:
         payload = await _load_with_cache(
             key="trends:platform",
             ttl_seconds=TREND_CACHE_TTL,
-            metric="trends.platform",
             loader=_loader,
         )
         metrics_recorder.increment_counter("trends.platform.generated")
@@ -465,7 +439,6 @@ async def get_grouped_metrics(
         payload = await _load_with_cache(
             key=cache_key,
             ttl_seconds=GROUPED_CACHE_TTL,
-            metric="grouped.metrics",
             loader=_loader,
         )
         metrics_recorder.observe_operation(
@@ -514,7 +487,6 @@ async def create_visualization(payload: VisualizationRequest) -> VisualizationRe
         cached = await _load_with_cache(
             key=cache_key,
             ttl_seconds=VISUALIZATION_CACHE_TTL,
-            metric="visualizations",
             loader=_loader,
         )
         metrics_recorder.observe_operation(
@@ -589,17 +561,14 @@ async def export_analytics(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="invalid profile id",
                 ) from exc
-            metadata["profileId"] = str(profile_uuid)
 
         loader: Callable[[], Any]
         cache_key: str
         ttl_seconds: float
-        metric: str
 
         if resource == ExportResource.PROFILE_STATS and profile_uuid:
             cache_key = f"stats:profile:{profile_uuid}"
             ttl_seconds = PROFILE_STATS_CACHE_TTL
-            metric = "stats.profile"
 
             async def _loader() -> Dict[str, object]:
                 return await database.fetch_profile_stats(profile_uuid)
@@ -607,7 +576,6 @@ async def export_analytics(
         elif resource == ExportResource.AGGREGATE:
             cache_key = "aggregate:platform"
             ttl_seconds = AGGREGATE_CACHE_TTL
-            metric = "aggregate"
 
             async def _loader() -> Dict[str, object]:
                 return await database.fetch_aggregate_metrics()
@@ -615,7 +583,6 @@ async def export_analytics(
         elif resource == ExportResource.PROFILE_TRENDS and profile_uuid:
             cache_key = f"trends:profile:{profile_uuid}"
             ttl_seconds = TREND_CACHE_TTL
-            metric = "trends.profile"
 
             async def _loader() -> Dict[str, object]:
                 return await database.fetch_profile_trends(profile_uuid)
@@ -623,7 +590,6 @@ async def export_analytics(
         elif resource == ExportResource.PLATFORM_TRENDS:
             cache_key = "trends:platform"
             ttl_seconds = TREND_CACHE_TTL
-            metric = "trends.platform"
 
             async def _loader() -> Dict[str, object]:
                 return await database.fetch_platform_trends()
@@ -637,7 +603,6 @@ async def export_analytics(
         payload = await _load_with_cache(
             key=cache_key,
             ttl_seconds=ttl_seconds,
-            metric=metric,
             loader=_loader,
         )
 
@@ -692,3 +657,8 @@ async def export_analytics(
 @router.get("/api/metrics")
 async def metrics():
     return metrics_recorder.snapshot()
+
+
+@router.get("/api/metrics/openmetrics", include_in_schema=False)
+async def openmetrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics_recorder.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
@@ -11,7 +11,7 @@ if SERVICES_DIR.exists() and str(SERVICES_DIR) not in sys.path:
     sys.path.insert(0, str(SERVICES_DIR))
 
 # Now we can import from python_shared
-from python_shared.config import parse_int, parse_bool, BaseServiceConfig
+from python_shared.config import parse_bool, parse_float, parse_int, BaseServiceConfig
 
 
 class ImageProcessorConfig(BaseServiceConfig):
@@ -37,12 +37,81 @@ class ImageProcessorConfig(BaseServiceConfig):
         allowed_modes_raw = os.getenv("IMAGE_PROCESSOR_ALLOWED_MODES", "contain,cover,fill,stretch,pad")
         self.allowed_modes = tuple(m.strip().lower() for m in allowed_modes_raw.split(",") if m.strip())
 
+        # Input limits, enforced from the image header before the body is fully read
+        self.max_upload_bytes = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_MAX_UPLOAD_BYTES"), 20 * 1024 * 1024))
+        self.max_input_pixels = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_MAX_INPUT_PIXELS"), 40_000_000))
+        self.sniff_bytes = max(1024, parse_int(os.getenv("IMAGE_PROCESSOR_SNIFF_BYTES"), 256 * 1024))
+        self.spool_bytes = max(0, parse_int(os.getenv("IMAGE_PROCESSOR_SPOOL_BYTES"), 1024 * 1024))
+        input_formats_raw = os.getenv("IMAGE_PROCESSOR_ALLOWED_INPUT_FORMATS", "jpeg,mpo,png,webp,gif,bmp,tiff")
+        self.allowed_input_formats = tuple(
+            f.strip().upper() for f in input_formats_raw.split(",") if f.strip()
+        )
+
+        # Animated inputs are re-encoded as animated WebP frame by frame, within these limits
+        self.max_animation_frames = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_MAX_ANIMATION_FRAMES"), 300))
+        self.max_animation_pixels = max(
+            1, parse_int(os.getenv("IMAGE_PROCESSOR_MAX_ANIMATION_PIXELS"), 400_000_000)
+        )
+
+        # Decoded-memory budget shared by all in-flight renders; requests wait up to
+        # DECODE_BUDGET_WAIT_SECONDS for room and are rejected with 503 afterwards
+        self.decode_budget_bytes = max(
+            1, parse_int(os.getenv("IMAGE_PROCESSOR_DECODE_BUDGET_BYTES"), 1024 * 1024 * 1024)
+        )
+        self.decode_budget_wait_seconds = max(
+            0.0, parse_float(os.getenv("IMAGE_PROCESSOR_DECODE_BUDGET_WAIT_SECONDS"), 5.0)
+        )
+
+        # Resampling policy: "quality" (full decode + LANCZOS), "balanced" (decoder
+        # downscale with 2x headroom + reducing_gap=3) or "speed" (tightest draft,
+        # reducing_gap=2, bicubic)
+        policy = os.getenv("IMAGE_PROCESSOR_RESAMPLE_POLICY", "balanced").strip().lower()
+        self.resample_policy = policy if policy in {"quality", "balanced", "speed"} else "balanced"
+
+        # Encoder profile: "realtime" (fastest encode), "balanced" or "archival"
+        # (smallest output: WebP method 6, optimized PNG at level 9)
+        profile = os.getenv("IMAGE_PROCESSOR_ENCODER_PROFILE", "archival").strip().lower()
+        self.encoder_profile = profile if profile in {"realtime", "balanced", "archival"} else "archival"
+
         # Other settings
         self.default_background = os.getenv("IMAGE_PROCESSOR_DEFAULT_BACKGROUND")
         self.default_strip_metadata = parse_bool(
             os.getenv("IMAGE_PROCESSOR_STRIP_METADATA_DEFAULT", "true"), True
         )
 
+        # Execution engine (process pool)
+        self.workers = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_WORKERS"), os.cpu_count() or 1))
+        self.max_queue_depth = max(
+            0, parse_int(os.getenv("IMAGE_PROCESSOR_MAX_QUEUE_DEPTH"), self.workers * 4)
+        )
+        self.job_timeout_seconds = max(
+            1.0, parse_float(os.getenv("IMAGE_PROCESSOR_JOB_TIMEOUT_SECONDS"), 30.0)
+        )
+        self.retry_after_seconds = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_RETRY_AFTER_SECONDS"), 2))
+
+        # Batch renditions
+        self.batch_max_renditions = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_BATCH_MAX_RENDITIONS"), 8))
+        self.batch_threads = max(1, parse_int(os.getenv("IMAGE_PROCESSOR_BATCH_THREADS"), 4))
+
+        # Result cache (memory LRU + optional disk tier)
+        self.cache_enabled = parse_bool(os.getenv("IMAGE_PROCESSOR_CACHE_ENABLED"), True)
+        self.cache_max_entries = parse_int(os.getenv("IMAGE_PROCESSOR_CACHE_MAX_ENTRIES"), 256)
+        self.cache_max_bytes = parse_int(os.getenv("IMAGE_PROCESSOR_CACHE_MAX_BYTES"), 64 * 1024 * 1024)
+        self.cache_dir = os.getenv("IMAGE_PROCESSOR_CACHE_DIR", "").strip() or None
+        self.cache_disk_max_bytes = parse_int(
+            os.getenv("IMAGE_PROCESSOR_CACHE_DISK_MAX_BYTES"), 512 * 1024 * 1024
+        )
+
+        # Per-stage Server-Timing header on single-image responses (exposes internals, off by default)
+        self.server_timing = parse_bool(os.getenv("IMAGE_PROCESSOR_SERVER_TIMING"), False)
+
+        # Pre-rendered catalogue store (built offline with app.services.catalogue)
+        self.catalogue_dir = os.getenv("IMAGE_PROCESSOR_CATALOGUE_DIR", "").strip() or None
+        self.catalogue_renditions = os.getenv(
+            "IMAGE_PROCESSOR_CATALOGUE_RENDITIONS",
+            "thumb:320x320:cover:webp,card:640x640:contain:webp,full:1280x1280:contain:webp",
+        )
+
     def clamp_dimension(self, value: Optional[int], fallback: int) -> int:
         """Clamp dimension to valid range."""
         if value is None:
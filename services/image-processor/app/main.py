@@ -3,6 +3,7 @@
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 from uuid import uuid4
 
@@ -11,7 +12,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from PIL import Image
 from starlette import status
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Add services directory to path
 SERVICES_DIR = Path(__file__).resolve().parent.parent.parent
@@ -26,13 +29,13 @@ if str(CURRENT_DIR) not in sys.path:
 
 from python_shared.graceful_shutdown import GracefulShutdownManager
 from python_shared.health import HealthCheckResult, HealthReporter
-from python_shared.metrics import MetricsMiddleware, MetricsRecorder
+from python_shared.metrics import OPENMETRICS_CONTENT_TYPE, MetricsMiddleware, MetricsRecorder
 from python_shared.rate_limit import RateLimitConfig, RateLimitMiddleware, RateLimiter
 from python_shared.tracing import TraceMiddleware
 
 from app.config import config
-from app.routes import process
-from app.services import ImageProcessor
+from app.routes import catalogue, process
+from app.services import CatalogueStore, DecodeBudget, ImageProcessor, ProcessingExecutor, ResultCache
 
 # Setup logging
 logging.basicConfig(level=config.log_level)
@@ -82,6 +85,7 @@ def _runtime_config_check() -> HealthCheckResult:
         allowedFormats=list(config.allowed_formats),
         allowedModes=list(config.allowed_modes),
         maxDimension=config.max_dimension,
+        maxInputPixels=config.max_input_pixels,
     )
 
 
@@ -97,17 +101,79 @@ def _pillow_check() -> HealthCheckResult:
         return HealthCheckResult.error(error=str(exc))
 
 
+# Process pool for CPU-bound image work
+processing_executor = ProcessingExecutor(
+    workers=config.workers,
+    max_queue_depth=config.max_queue_depth,
+    job_timeout_seconds=config.job_timeout_seconds,
+    retry_after_seconds=config.retry_after_seconds,
+    logger=logger,
+    metrics_recorder=metrics_recorder,
+)
+
+
+def _executor_check() -> HealthCheckResult:
+    """Report process pool occupancy."""
+    stats = processing_executor.stats()
+    if processing_executor.in_flight >= processing_executor.capacity:
+        return HealthCheckResult.degraded(reason="pool saturated", **stats)
+    return HealthCheckResult.ok(**stats)
+
+
+# Decoded-memory admission control
+decode_budget = DecodeBudget(
+    max_bytes=config.decode_budget_bytes,
+    wait_seconds=config.decode_budget_wait_seconds,
+    retry_after_seconds=config.retry_after_seconds,
+    logger=logger,
+    metrics_recorder=metrics_recorder,
+)
+
+
+def _decode_budget_check() -> HealthCheckResult:
+    """Report decoded-memory budget usage."""
+    stats = decode_budget.stats()
+    if decode_budget.saturated:
+        return HealthCheckResult.degraded(reason="memory budget exhausted", **stats)
+    return HealthCheckResult.ok(**stats)
+
+
 health_reporter.register("runtime", _runtime_config_check)
 health_reporter.register("pillow", _pillow_check)
+health_reporter.register("executor", _executor_check)
+health_reporter.register("decodeBudget", _decode_budget_check)
+
+# Content-addressed result cache
+result_cache = (
+    ResultCache(
+        max_entries=config.cache_max_entries,
+        max_bytes=config.cache_max_bytes,
+        directory=config.cache_dir,
+        disk_max_bytes=config.cache_disk_max_bytes,
+        logger=logger,
+        metrics_recorder=metrics_recorder,
+    )
+    if config.cache_enabled
+    else None
+)
 
 # Initialize image processor
-image_processor = ImageProcessor(logger, metrics_recorder)
+image_processor = ImageProcessor(
+    logger, metrics_recorder, processing_executor, result_cache, decode_budget
+)
+
+# Pre-rendered catalogue (read-only)
+catalogue_store = CatalogueStore(config.catalogue_dir) if config.catalogue_dir else None
+if catalogue_store is not None:
+    health_reporter.register("catalogue", lambda: HealthCheckResult.ok(**catalogue_store.stats()))
 
 # Set global instances for routes
 process.image_processor = image_processor
+catalogue.catalogue_store = catalogue_store
 
 # Register routes
 app.include_router(process.router)
+app.include_router(catalogue.router)
 
 
 @app.get("/api/health")
@@ -122,41 +188,66 @@ async def metrics_endpoint():
     return metrics_recorder.snapshot()
 
 
+@app.get("/api/metrics/openmetrics", include_in_schema=False)
+async def openmetrics_endpoint():
+    """Metrics in the OpenMetrics text format for Prometheus scrapes."""
+    return Response(metrics_recorder.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+
 # Request context middleware
-@app.middleware("http")
-async def request_context(request: Request, call_next):
-    """Add request ID and timing."""
-    import time
-    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid4().hex
-    request.state.request_id = request_id
-    start = time.perf_counter()
-    try:
-        response: Response = await call_next(request)
-    except Exception:
+class RequestContextMiddleware:
+    """Assign a request ID, echo it on the response and log the request's outcome."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        start = time.perf_counter()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                if REQUEST_ID_HEADER not in headers:
+                    headers[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            duration_ms = (time.perf_counter() - start) * 1000
+            logger.info(
+                "request.failed",
+                extra={
+                    "path": scope["path"],
+                    "method": scope["method"],
+                    "request_id": request_id,
+                    "duration_ms": round(duration_ms, 2),
+                },
+            )
+            raise
         duration_ms = (time.perf_counter() - start) * 1000
         logger.info(
-            "request.failed",
+            "request.completed",
             extra={
-                "path": request.url.path,
-                "method": request.method,
+                "path": scope["path"],
+                "method": scope["method"],
+                "status_code": status_code,
                 "request_id": request_id,
                 "duration_ms": round(duration_ms, 2),
             },
         )
-        raise
-    duration_ms = (time.perf_counter() - start) * 1000
-    logger.info(
-        "request.completed",
-        extra={
-            "path": request.url.path,
-            "method": request.method,
-            "status_code": response.status_code,
-            "request_id": request_id,
-            "duration_ms": round(duration_ms, 2),
-        },
-    )
-    response.headers.setdefault(REQUEST_ID_HEADER, request_id)
-    return response
+
+
+app.add_middleware(RequestContextMiddleware)
 
 
 # Error handlers
@@ -177,7 +268,7 @@ async def handle_http_exception(request: Request, exc: HTTPException) -> JSONRes
     code = "bad_request" if exc.status_code < status.HTTP_500_INTERNAL_SERVER_ERROR else "server_error"
     return JSONResponse(
         status_code=exc.status_code,
-        headers={REQUEST_ID_HEADER: request_id},
+        headers={**(exc.headers or {}), REQUEST_ID_HEADER: request_id},
         content={
             "error": {
                 "code": code,
@@ -215,10 +306,17 @@ async def handle_unexpected_exception(request: Request, exc: Exception) -> JSONR
 
 @shutdown_manager.callback
 def _log_shutdown_metrics() -> None:
-    """Log metrics on shutdown."""
+    """Stop the metrics flusher and log the final snapshot."""
+    metrics_recorder.close()
     logger.info("image-processor metrics snapshot", extra={"metrics": metrics_recorder.snapshot()})
 
 
+@shutdown_manager.callback
+def _stop_processing_pool() -> None:
+    """Stop the image processing pool."""
+    processing_executor.shutdown()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -31,6 +31,9 @@ class AdjustmentOptions(BaseModel):
     grayscale: bool = False
     sharpen: bool = False
     stripMetadata: bool = True
+    brightness: float = Field(default=1.0, ge=0.0, le=4.0, description="Brightness factor (1 = unchanged)")
+    contrast: float = Field(default=1.0, ge=0.0, le=4.0, description="Contrast factor around mid-grey (1 = unchanged)")
+    autoLevel: bool = Field(default=False, description="Stretch each channel to the full 0-255 range")
 
 
 class ImageProcessRequest(BaseModel):
@@ -40,6 +43,7 @@ class ImageProcessRequest(BaseModel):
     quality: Optional[int] = Field(default=None, description="JPEG/WebP quality (10-100)")
     format: Optional[str] = Field(default=None, description="Target format (e.g. webp)")
     adjustments: AdjustmentOptions | None = None
+    profile: Optional[str] = Field(default=None, description="Encoder profile: realtime, balanced or archival")
 
     @field_validator("image")
     @classmethod
@@ -56,6 +60,7 @@ class AppliedOptions(BaseModel):
     background: Optional[str] = None
     format: str
     adjustments: AdjustmentOptions
+    profile: Optional[str] = None
 
 
 class ImageProcessResponse(BaseModel):
@@ -67,6 +72,49 @@ class ImageProcessResponse(BaseModel):
     size: int
     optimized: bool
     options: AppliedOptions
+    frames: int = Field(default=1, description="Frame count; above 1 for animated WebP output")
+
+
+class RenditionSpec(BaseModel):
+    """A single output requested from a batch."""
+    name: str = Field(min_length=1, max_length=64, description="Client label, e.g. thumbnail")
+    resize: ResizeOptions | None = None
+    quality: Optional[int] = Field(default=None, description="JPEG/WebP quality (10-100)")
+    format: Optional[str] = Field(default=None, description="Target format (e.g. webp)")
+    adjustments: AdjustmentOptions | None = None
+    profile: Optional[str] = Field(default=None, description="Encoder profile: realtime, balanced or archival")
+
+
+class ImageBatchRequest(BaseModel):
+    """Request for several renditions of one source image."""
+    image: str
+    renditions: List[RenditionSpec] = Field(min_length=1)
+    parallel: bool = Field(default=False, description="Encode renditions concurrently")
+
+    @field_validator("image")
+    @classmethod
+    def _ensure_image_payload(cls, value: str) -> str:
+        if not value or not value.strip():
+            raise ValueError("Image payload is required")
+        return value
+
+    @field_validator("renditions")
+    @classmethod
+    def _ensure_unique_names(cls, value: List[RenditionSpec]) -> List[RenditionSpec]:
+        names = [spec.name for spec in value]
+        if len(set(names)) != len(names):
+            raise ValueError("Rendition names must be unique")
+        return value
+
+
+class RenditionResponse(ImageProcessResponse):
+    """Processed image for a named rendition."""
+    name: str
+
+
+class ImageBatchResponse(BaseModel):
+    """Response with every requested rendition, in request order."""
+    renditions: List[RenditionResponse]
 
 
 class ImageUploadParams(BaseModel):
@@ -78,9 +126,13 @@ class ImageUploadParams(BaseModel):
     background: Optional[str] = None
     quality: Optional[int] = None
     outputFormat: Optional[str] = None
+    profile: Optional[str] = None
     grayscale: Optional[bool] = None
     sharpen: Optional[bool] = None
     stripMetadata: Optional[bool] = None
+    brightness: Optional[float] = Field(default=None, ge=0.0, le=4.0)
+    contrast: Optional[float] = Field(default=None, ge=0.0, le=4.0)
+    autoLevel: Optional[bool] = None
 
     def resize_options(self) -> ResizeOptions | None:
         """Convert to ResizeOptions if any resize params are set."""
@@ -102,10 +154,23 @@ class ImageUploadParams(BaseModel):
 
     def adjustment_options(self) -> AdjustmentOptions | None:
         """Convert to AdjustmentOptions if any adjustment params are set."""
-        if self.grayscale is None and self.sharpen is None and self.stripMetadata is None:
+        if all(
+            value is None
+            for value in (
+                self.grayscale,
+                self.sharpen,
+                self.stripMetadata,
+                self.brightness,
+                self.contrast,
+                self.autoLevel,
+            )
+        ):
             return None
         return AdjustmentOptions(
             grayscale=self.grayscale or False,
             sharpen=self.sharpen or False,
             stripMetadata=self.stripMetadata if self.stripMetadata is not None else True,
+            brightness=self.brightness if self.brightness is not None else 1.0,
+            contrast=self.contrast if self.contrast is not None else 1.0,
+            autoLevel=self.autoLevel or False,
         )
@@ -0,0 +1,40 @@
+"""Pre-render catalogue images into the store served by /api/catalogue.
+
+Usage:
+    python -m app.precompute --source ../../картинки --output /data/catalogue
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from app.config import config
+from app.services.catalogue import build_catalogue, parse_renditions
+from app.services.image_service import ImageProcessor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-render catalogue images into a content-addressed store")
+    parser.add_argument("--source", required=True, help="asset directory to walk")
+    parser.add_argument("--output", default=config.catalogue_dir, help="store directory")
+    parser.add_argument("--renditions", default=config.catalogue_renditions, help="name:WxH:mode:format,...")
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("--output or IMAGE_PROCESSOR_CATALOGUE_DIR is required")
+
+    logging.basicConfig(level=config.log_level)
+    logger = logging.getLogger("tzona.image_processor.catalogue")
+    manifest = build_catalogue(
+        Path(args.source),
+        Path(args.output),
+        parse_renditions(args.renditions),
+        ImageProcessor(logger, None),
+        logger,
+    )
+    print(f"{len(manifest['assets'])} assets written to {args.output}")
+    if manifest["failed"]:
+        print(f"{len(manifest['failed'])} assets failed: {', '.join(sorted(manifest['failed']))}")
+
+
+if __name__ == "__main__":
+    main()
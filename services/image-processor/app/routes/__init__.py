@@ -1,5 +1,5 @@
 """Routes package."""
 
-from . import health, process
+from . import catalogue, health, process
 
-__all__ = ["health", "process"]
+__all__ = ["catalogue", "health", "process"]
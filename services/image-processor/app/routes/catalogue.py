@@ -0,0 +1,62 @@
+"""Read-only routes for the pre-rendered catalogue store."""
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.responses import FileResponse, RedirectResponse, Response
+
+# Global instance (will be set in main.py when IMAGE_PROCESSOR_CATALOGUE_DIR is configured)
+catalogue_store = None  # type: ignore
+
+router = APIRouter()
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _require_store():
+    if catalogue_store is None:
+        raise HTTPException(status_code=404, detail="Catalogue is not configured")
+    return catalogue_store
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+@router.get("/api/catalogue/manifest")
+async def catalogue_manifest() -> Dict[str, Any]:
+    """Asset paths mapped to their rendition keys."""
+    return _require_store().manifest
+
+
+@router.get("/api/catalogue/objects/{key}")
+async def catalogue_object(key: str, request: Request) -> Response:
+    """Serve a rendition by content key; the bytes behind a key never change."""
+    found = _require_store().object(key.split(".", 1)[0])
+    if found is None:
+        raise HTTPException(status_code=404, detail="Catalogue object not found")
+    path, item = found
+    etag = f'"{item["key"]}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=item["format"], headers=headers)
+
+
+@router.get("/api/catalogue/{rendition}/{asset:path}")
+async def catalogue_asset(rendition: str, asset: str, request: Request) -> Response:
+    """Resolve an asset path to its current content key."""
+    item = _require_store().lookup(asset, rendition)
+    if item is None:
+        raise HTTPException(status_code=404, detail="Catalogue rendition not found")
+    # The path-to-key mapping changes when the store is rebuilt, so only the
+    # redirect target is cacheable forever. The Location is relative so the
+    # internal host behind the gateway never leaks.
+    target = request.app.url_path_for("catalogue_object", key=f"{item['key']}.{item['extension']}")
+    return RedirectResponse(
+        f"{request.scope.get('root_path', '').rstrip('/')}{target}",
+        status_code=307,
+        headers={"Cache-Control": "public, max-age=300"},
+    )
@@ -1,28 +1,202 @@
 """Image processing routes."""
 
-from typing import Annotated
+import json
+from typing import Annotated, Optional, Union
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette import status
+from starlette.responses import Response
 
-from app.models import ImageProcessRequest, ImageProcessResponse, ImageUploadParams
+from app.config import config
+from app.models import (
+    ImageBatchRequest,
+    ImageBatchResponse,
+    ImageProcessRequest,
+    ImageProcessResponse,
+    ImageUploadParams,
+)
+from app.services.image_service import ProcessedImage, _canonical_format
+from app.services.ingest import BoundedBodyRoute, ingest_multipart
 
 # Global instances (will be set in main.py)
 image_processor = None  # type: ignore
 
-router = APIRouter()
+router = APIRouter(route_class=BoundedBodyRoute)
 
+BINARY_RESPONSES = {
+    200: {
+        "content": {
+            "application/json": {},
+            "image/webp": {"schema": {"type": "string", "format": "binary"}},
+            "image/jpeg": {"schema": {"type": "string", "format": "binary"}},
+            "image/png": {"schema": {"type": "string", "format": "binary"}},
+        },
+        "description": "JSON with base64 payload, or raw image bytes when requested via Accept or ?raw=1",
+    }
+}
 
-@router.post("/api/process-image", response_model=ImageProcessResponse)
-async def process_image(request: ImageProcessRequest) -> ImageProcessResponse:
+UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
+
+_JSON_MEDIA_TYPE = "application/json"
+
+
+def _accept_ranges(request: Request) -> list[tuple[str, str, float]]:
+    """Parse the Accept header into ``(type, subtype, q)`` media ranges."""
+    ranges = []
+    for segment in request.headers.get("accept", "").split(","):
+        media_range, *params = [part.strip() for part in segment.split(";")]
+        if "/" not in media_range:
+            continue
+        main_type, subtype = media_range.lower().split("/", 1)
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(1.0, max(0.0, float(value)))
+                except ValueError:
+                    quality = 0.0
+        ranges.append((main_type, subtype, quality))
+    return ranges
+
+
+def _quality(ranges: list[tuple[str, str, float]], media_type: str) -> tuple[float, int]:
+    """Return the q-value of the most specific range matching ``media_type`` and that specificity."""
+    main_type, subtype = media_type.split("/", 1)
+    best = (0.0, -1)
+    for range_type, range_subtype, quality in ranges:
+        if range_type == main_type and range_subtype == subtype:
+            specificity = 2
+        elif range_type == main_type and range_subtype == "*":
+            specificity = 1
+        elif range_type == "*" and range_subtype == "*":
+            specificity = 0
+        else:
+            continue
+        if specificity > best[1]:
+            best = (quality, specificity)
+    return best
+
+
+def _negotiate(request: Request, raw: bool, requested_format: Optional[str]) -> tuple[bool, Optional[str]]:
+    """Choose JSON or raw image bytes, and the image format, from the Accept header's q-values.
+
+    Returns ``(binary, format)``. The highest-q acceptable type wins; on a tie
+    the more specific range wins, then JSON, then the default output format.
+    ``?raw=1`` rules JSON out. Raises 406 when nothing acceptable can be produced.
+    """
+    ranges = _accept_ranges(request)
+    if not ranges:
+        return raw, requested_format
+    requested = _canonical_format(requested_format)
+    if requested and requested not in config.allowed_formats:
+        # Unsupported formats are rejected with 400 by the processor.
+        return raw, requested_format
+    if requested:
+        formats = [requested]
+    else:
+        formats = sorted(config.allowed_formats, key=lambda fmt: fmt != config.default_format)
+    best_image: Optional[tuple[float, int, str]] = None
+    for fmt in formats:
+        quality, specificity = _quality(ranges, f"image/{fmt.lower()}")
+        if quality > 0 and (best_image is None or (quality, specificity) > best_image[:2]):
+            best_image = (quality, specificity, fmt)
+    json_quality = _quality(ranges, _JSON_MEDIA_TYPE)
+    if not raw and json_quality[0] > 0 and (best_image is None or json_quality >= best_image[:2]):
+        return False, requested_format
+    if best_image is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="None of the media types in the Accept header can be produced",
+        )
+    return True, best_image[2]
+
+
+def _binary_response(result: ProcessedImage) -> Response:
+    """Send the encoded bytes as-is with metadata in headers."""
+    options = json.dumps(result.applied.model_dump(), separators=(",", ":"))
+    return Response(
+        content=result.data,
+        media_type=f"image/{result.format.lower()}",
+        headers={
+            "X-Image-Width": str(result.width),
+            "X-Image-Height": str(result.height),
+            "X-Image-Format": f"image/{result.format.lower()}",
+            "X-Image-Source-Format": result.source_format,
+            "X-Image-Frames": str(result.frames),
+            "X-Image-Options": options,
+        },
+    )
+
+
+def _set_server_timing(response: Response, result: ProcessedImage) -> None:
+    """Expose per-stage durations (ms) as a Server-Timing header when enabled."""
+    if not config.server_timing:
+        return
+    entries = [f"{stage};dur={duration_ms:.1f}" for stage, duration_ms in result.timings.items()]
+    if result.cached:
+        entries.insert(0, 'cache;desc="hit"')
+    if entries:
+        response.headers["Server-Timing"] = ", ".join(entries)
+
+
+def _respond(result: ProcessedImage, response: Response, binary: bool) -> Union[ImageProcessResponse, Response]:
+    if binary:
+        response = _binary_response(result)
+        _set_server_timing(response, result)
+        return response
+    payload = image_processor.to_response(result)
+    _set_server_timing(response, result)
+    return payload
+
+
+@router.post("/api/process-image", response_model=ImageProcessResponse, responses=BINARY_RESPONSES)
+async def process_image(
+    request: ImageProcessRequest,
+    http_request: Request,
+    response: Response,
+    raw: Annotated[bool, Query(description="Return raw image bytes instead of JSON")] = False,
+) -> Union[ImageProcessResponse, Response]:
     """Optimize a base64 encoded image."""
-    return await image_processor.process_base64(request)
+    binary, request.format = _negotiate(http_request, raw, request.format)
+    result = await image_processor.process_base64(request)
+    return _respond(result, response, binary)
 
 
-@router.post("/api/process-image/upload", response_model=ImageProcessResponse)
+@router.post(
+    "/api/process-image/upload",
+    response_model=ImageProcessResponse,
+    responses=BINARY_RESPONSES,
+    openapi_extra=UPLOAD_BODY,
+)
 async def process_uploaded_image(
-    file: Annotated[UploadFile, File(...)],
     params: Annotated[ImageUploadParams, Depends()],
-) -> ImageProcessResponse:
-    """Optimize an uploaded file."""
-    content = await file.read()
-    return await image_processor.process_upload(content, params)
+    http_request: Request,
+    response: Response,
+    raw: Annotated[bool, Query(description="Return raw image bytes instead of JSON")] = False,
+) -> Union[ImageProcessResponse, Response]:
+    """Optimize an uploaded file, streamed and validated as it arrives."""
+    binary, params.outputFormat = _negotiate(http_request, raw, params.outputFormat)
+    upload = await ingest_multipart(http_request)
+    result = await image_processor.process_upload(upload.data, params)
+    return _respond(result, response, binary)
+
+
+@router.post("/api/process-image/batch", response_model=ImageBatchResponse)
+async def process_image_batch(request: ImageBatchRequest) -> ImageBatchResponse:
+    """Produce several renditions of one image from a single decode."""
+    return await image_processor.process_batch(request)
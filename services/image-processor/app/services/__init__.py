@@ -1,5 +1,9 @@
 """Services package."""
 
+from .catalogue import CatalogueStore
+from .executor import ProcessingExecutor
 from .image_service import ImageProcessor
+from .memory_budget import DecodeBudget
+from .result_cache import ResultCache
 
-__all__ = ["ImageProcessor"]
+__all__ = ["CatalogueStore", "DecodeBudget", "ImageProcessor", "ProcessingExecutor", "ResultCache"]
@@ -0,0 +1,80 @@
+"""Colour adjustments with at most one pixel pass per stage.
+
+Auto-level, brightness and contrast are folded with NumPy into a single
+lookup table per band and applied in one ``Image.point`` pass, so chaining
+them costs one frame instead of one per operation. Grayscale stays single
+band (L/LA) through to the encoder instead of being expanded back to RGB.
+Pixel passes run in Pillow's C loops; a per-pixel NumPy LUT (``np.take``)
+measured several times slower on service-sized frames.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+from PIL import Image, ImageFilter
+
+from app.models import AdjustmentOptions
+
+_IDENTITY = np.arange(256, dtype=np.float32)
+_LEVEL_MODES = {"L", "LA", "RGB", "RGBA"}
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return "A" in image.getbands() or "transparency" in image.info
+
+
+def levels_lut(
+    histograms: Optional[np.ndarray], bands: int, colour_bands: int, *, brightness: float, contrast: float
+) -> list[int]:
+    """Build a ``point`` table applying auto-level, brightness then contrast; alpha is left as is."""
+    table = []
+    for band in range(bands):
+        values = _IDENTITY
+        if band < colour_bands:
+            if histograms is not None:
+                occupied = np.flatnonzero(histograms[band])
+                if occupied.size and occupied[-1] > occupied[0]:
+                    low, high = occupied[0], occupied[-1]
+                    values = (values - low) * (255.0 / (high - low))
+            values = (values * brightness - 128.0) * contrast + 128.0
+        table.extend(np.clip(np.rint(values), 0, 255).astype(np.uint8).tolist())
+    return table
+
+
+def run_adjustments(image: Image.Image, adjustments: AdjustmentOptions) -> tuple[Image.Image, Dict[str, float]]:
+    """Apply the requested adjustments, returning the image and per-stage timings in ms."""
+    timings: Dict[str, float] = {}
+
+    if adjustments.grayscale and image.mode not in {"L", "LA"}:
+        started = time.perf_counter()
+        image = image.convert("LA" if _has_alpha(image) else "L")
+        timings["adjust.grayscale"] = (time.perf_counter() - started) * 1000
+
+    if adjustments.autoLevel or adjustments.brightness != 1.0 or adjustments.contrast != 1.0:
+        started = time.perf_counter()
+        if image.mode not in _LEVEL_MODES:
+            image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+        bands = len(image.getbands())
+        colour_bands = 1 if image.mode in {"L", "LA"} else 3
+        histograms = np.asarray(image.histogram()).reshape(bands, 256) if adjustments.autoLevel else None
+        image = image.point(
+            levels_lut(
+                histograms,
+                bands,
+                colour_bands,
+                brightness=adjustments.brightness,
+                contrast=adjustments.contrast,
+            )
+        )
+        timings["adjust.levels"] = (time.perf_counter() - started) * 1000
+
+    if adjustments.sharpen:
+        started = time.perf_counter()
+        if image.mode in {"P", "1"}:
+            image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+        image = image.filter(ImageFilter.UnsharpMask(radius=1.2, percent=150, threshold=3))
+        timings["adjust.sharpen"] = (time.perf_counter() - started) * 1000
+    return image, timings
@@ -0,0 +1,102 @@
+"""Frame-streamed processing for animated WebP and GIF inputs.
+
+Frames are decoded, transformed and handed to libwebp's incremental
+animation encoder one at a time, so memory stays proportional to a single
+frame rather than to the whole sequence. Pillow's animated WebP writer pulls
+frames through the multi-frame ``n_frames``/``seek`` protocol; ``FrameStream``
+implements that protocol by rendering each output frame on demand.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Callable
+
+from fastapi import HTTPException
+from PIL import Image
+
+from app.config import config
+
+
+def check_frame_budget(image: Image.Image) -> int:
+    """Reject animations whose frame count or total pixel count exceeds the limits."""
+    frames = getattr(image, "n_frames", 1)
+    if frames > config.max_animation_frames:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Animation has {frames} frames, the limit is {config.max_animation_frames}",
+        )
+    pixels = frames * image.width * image.height
+    if pixels > config.max_animation_pixels:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Animation has {pixels} pixels across all frames, the limit is {config.max_animation_pixels}",
+        )
+    return frames
+
+
+# FrameStream swaps frames in by assigning these private ``Image.Image`` attributes;
+# the writer reads pixels through ``im`` and ``mode``/``size`` are properties over
+# ``_mode``/``_size`` (Pillow 10.1+). Fail at import rather than encode garbage if
+# a Pillow release renames them; requirements.txt caps Pillow at the tested major.
+_FRAME_ATTRIBUTES = ("im", "_mode", "_size")
+_probe = Image.new("L", (1, 1))
+if not all(hasattr(_probe, name) for name in _FRAME_ATTRIBUTES) or not isinstance(
+    getattr(type(_probe), "mode", None), property
+):
+    raise ImportError(
+        f"Pillow {Image.__version__} does not expose Image.{', Image.'.join(_FRAME_ATTRIBUTES)}, "
+        "which FrameStream relies on"
+    )
+del _probe
+
+
+class FrameStream(Image.Image):
+    """Forward-only multi-frame image whose frames are rendered on ``seek``.
+
+    Only the current output frame is held; it is replaced on the next seek,
+    once the encoder has consumed it. Per-frame durations are read from the
+    source as frames are decoded and collected in ``durations``, which the
+    writer indexes after each seek. Backward seeks (the writer restoring its
+    start position) are ignored.
+    """
+
+    def __init__(self, source: Image.Image, render: Callable[[Image.Image], Image.Image]) -> None:
+        super().__init__()
+        self._source = source
+        self._render = render
+        self._frame = -1
+        self.n_frames = getattr(source, "n_frames", 1)
+        self.is_animated = self.n_frames > 1
+        self.durations: list[int] = []
+        self.seek(0)
+
+    def tell(self) -> int:
+        return self._frame
+
+    def seek(self, frame: int) -> None:
+        if frame <= self._frame:
+            return
+        self._source.seek(frame)
+        output = self._render(self._source)
+        self.durations.append(int(self._source.info.get("duration", 0)))
+        # See _FRAME_ATTRIBUTES: Pillow has no public way to replace an image's pixels in place.
+        self.im = output.im
+        self._mode = output.mode
+        self._size = output.size
+        self._frame = frame
+
+
+def encode_animated_webp(stream: FrameStream, *, quality: int, method: int, loop: int) -> memoryview:
+    """Encode every frame of ``stream`` into an animated WebP."""
+    buffer = io.BytesIO()
+    stream.save(
+        buffer,
+        format="WEBP",
+        save_all=True,
+        duration=stream.durations,
+        loop=loop,
+        quality=quality,
+        method=method,
+    )
+    return buffer.getbuffer().toreadonly()
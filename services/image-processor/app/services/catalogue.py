@@ -0,0 +1,219 @@
+"""Pre-rendered store for static catalogue images.
+
+``build_catalogue`` walks an asset directory, renders the configured
+renditions of every image once and writes them into a content-addressed
+store (``objects/<key[:2]>/<key>.<ext>``, keyed by the sha256 of the output)
+together with a ``manifest.json`` mapping asset paths to rendition keys.
+``CatalogueStore`` serves that layout read-only.
+
+Build or refresh a store with ``python -m app.precompute``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.models import ResizeOptions, RenditionSpec
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+SOURCE_SUFFIXES = {".webp", ".jpg", ".jpeg", ".png"}
+_KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+_RENDITION_PATTERN = re.compile(r"(?P<name>[\w-]+):(?P<width>\d+)x(?P<height>\d+):(?P<mode>\w+):(?P<format>\w+)")
+
+
+@dataclass(frozen=True)
+class CatalogueRendition:
+    """One output size generated for every catalogue asset."""
+
+    name: str
+    width: int
+    height: int
+    mode: str
+    format: str
+
+    def to_spec(self) -> RenditionSpec:
+        return RenditionSpec(
+            name=self.name,
+            resize=ResizeOptions(maxWidth=self.width, maxHeight=self.height, mode=self.mode),
+            format=self.format,
+            profile="archival",
+        )
+
+
+def parse_renditions(raw: str) -> list[CatalogueRendition]:
+    """Parse ``name:WIDTHxHEIGHT:mode:format`` entries separated by commas."""
+    renditions = []
+    for entry in (part.strip() for part in raw.split(",")):
+        if not entry:
+            continue
+        match = _RENDITION_PATTERN.fullmatch(entry)
+        if not match:
+            raise ValueError(f"Invalid catalogue rendition '{entry}', expected name:WIDTHxHEIGHT:mode:format")
+        renditions.append(
+            CatalogueRendition(
+                name=match["name"],
+                width=int(match["width"]),
+                height=int(match["height"]),
+                mode=match["mode"].lower(),
+                format=match["format"].lower(),
+            )
+        )
+    return renditions
+
+
+def _object_path(root: Path, key: str, extension: str) -> Path:
+    return root / "objects" / key[:2] / f"{key}.{extension}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(root: Path) -> Dict[str, Any]:
+    try:
+        manifest = json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def build_catalogue(
+    source_dir: Path,
+    output_dir: Path,
+    renditions: list[CatalogueRendition],
+    processor,
+    logger: Optional[logging.Logger] = None,
+) -> Dict[str, Any]:
+    """Render every asset under ``source_dir`` and write the store plus manifest.
+
+    Assets whose source hash and rendition set match the existing manifest are
+    skipped, so re-running after adding a few images only renders those. An
+    asset that cannot be read or rendered is logged, left out and listed under
+    ``failed`` in the manifest instead of aborting the build.
+    """
+    logger = logger or logging.getLogger("tzona.image_processor.catalogue")
+    previous = _load_manifest(output_dir)
+    rendition_config = [asdict(rendition) for rendition in renditions]
+    reusable = previous.get("assets", {}) if previous.get("renditions") == rendition_config else {}
+    specs = [rendition.to_spec() for rendition in renditions]
+    assets: Dict[str, Any] = {}
+    failed: Dict[str, str] = {}
+    rendered = skipped = 0
+
+    for path in sorted(source_dir.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in SOURCE_SUFFIXES:
+            continue
+        relative = path.relative_to(source_dir).as_posix()
+        try:
+            raw_bytes = path.read_bytes()
+            source_hash = hashlib.sha256(raw_bytes).hexdigest()
+            entry = reusable.get(relative)
+            if entry and entry.get("sourceHash") == source_hash and all(
+                _object_path(output_dir, item["key"], item["extension"]).exists()
+                for item in entry["renditions"].values()
+            ):
+                assets[relative] = entry
+                skipped += 1
+                continue
+            outputs = _render_asset(raw_bytes, renditions, specs, processor, output_dir)
+        except Exception as exc:
+            detail = getattr(exc, "detail", None) or str(exc) or type(exc).__name__
+            logger.warning("catalogue asset failed", extra={"asset": relative, "error": detail}, exc_info=True)
+            failed[relative] = detail
+            continue
+        assets[relative] = {"sourceHash": source_hash, "renditions": outputs}
+        rendered += 1
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "renditions": rendition_config,
+        "assets": assets,
+        "failed": failed,
+    }
+    _write_atomic(
+        output_dir / MANIFEST_NAME,
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8"),
+    )
+    logger.info(
+        "catalogue built",
+        extra={"assets": len(assets), "rendered": rendered, "skipped": skipped, "failed": len(failed)},
+    )
+    return manifest
+
+
+def _render_asset(
+    raw_bytes: bytes,
+    renditions: list[CatalogueRendition],
+    specs: list[RenditionSpec],
+    processor,
+    output_dir: Path,
+) -> Dict[str, Any]:
+    """Render and store every rendition of one asset, returning its manifest entries."""
+    outputs = {}
+    for rendition, result in zip(renditions, processor.render_renditions(raw_bytes, specs, parallel=False)):
+        key = hashlib.sha256(result.data).hexdigest()
+        extension = result.format.lower()
+        object_path = _object_path(output_dir, key, extension)
+        if not object_path.exists():
+            _write_atomic(object_path, result.data)
+        outputs[rendition.name] = {
+            "key": key,
+            "extension": extension,
+            "format": f"image/{extension}",
+            "width": result.width,
+            "height": result.height,
+            "size": len(result.data),
+        }
+    return outputs
+
+
+class CatalogueStore:
+    """Read-only view of a store produced by ``build_catalogue``."""
+
+    def __init__(self, directory: str) -> None:
+        self._root = Path(directory)
+        self._manifest = _load_manifest(self._root)
+        self._objects: Dict[str, Dict[str, Any]] = {}
+        for entry in self._manifest.get("assets", {}).values():
+            for item in entry["renditions"].values():
+                self._objects[item["key"]] = item
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        return self._manifest
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "assets": len(self._manifest.get("assets", {})),
+            "failed": len(self._manifest.get("failed", {})),
+            "objects": len(self._objects),
+            "renditions": [item["name"] for item in self._manifest.get("renditions", [])],
+        }
+
+    def lookup(self, asset: str, rendition: str) -> Optional[Dict[str, Any]]:
+        """Return the rendition entry for an asset path, if it was pre-rendered."""
+        entry = self._manifest.get("assets", {}).get(asset)
+        if entry is None:
+            return None
+        return entry["renditions"].get(rendition)
+
+    def object(self, key: str) -> Optional[tuple[Path, Dict[str, Any]]]:
+        """Return the file path and metadata for a content key."""
+        if not _KEY_PATTERN.fullmatch(key):
+            return None
+        item = self._objects.get(key)
+        if item is None:
+            return None
+        path = _object_path(self._root, key, item["extension"])
+        return (path, item) if path.is_file() else None
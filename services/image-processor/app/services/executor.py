@@ -0,0 +1,160 @@
+"""Bounded process-pool execution engine for CPU-heavy image work."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from starlette import status
+
+
+class ProcessingExecutor:
+    """Dispatches image jobs to a process pool with admission control.
+
+    Jobs beyond ``workers + max_queue_depth`` are rejected with 503 and a
+    ``Retry-After`` hint instead of piling up behind the pool, and each job is
+    bounded by ``job_timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_queue_depth: int,
+        job_timeout_seconds: float,
+        retry_after_seconds: int,
+        logger: logging.Logger,
+        metrics_recorder=None,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._max_queue_depth = max(0, max_queue_depth)
+        self._job_timeout = job_timeout_seconds
+        self._retry_after = retry_after_seconds
+        self._logger = logger
+        self._metrics = metrics_recorder
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._publish_gauges()
+
+    @property
+    def capacity(self) -> int:
+        return self._workers + self._max_queue_depth
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current pool occupancy."""
+        busy = min(self._in_flight, self._workers)
+        return {
+            "workers": self._workers,
+            "inFlight": self._in_flight,
+            "queueDepth": max(0, self._in_flight - self._workers),
+            "maxQueueDepth": self._max_queue_depth,
+            "utilisation": round(busy / self._workers, 3),
+            "jobTimeoutSeconds": self._job_timeout,
+        }
+
+    def check_capacity(self) -> None:
+        """Raise 503 if a job submitted now would be rejected."""
+        if self._in_flight >= self.capacity:
+            if self._metrics:
+                self._metrics.increment_counter("image_processor.pool.rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image processor is at capacity, retry later",
+                headers={"Retry-After": str(self._retry_after)},
+            )
+
+    async def run(
+        self, func: Callable[..., Any], *args: Any, on_done: Optional[Callable[[], None]] = None
+    ) -> Any:
+        """Run ``func(*args)`` in the pool and await its result.
+
+        ``on_done`` is called on the event loop once the job has left the pool,
+        which can be after a timeout has been reported to the caller, or right
+        away if the job is rejected.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            self.check_capacity()
+            future = self._submit(func, *args)
+        except BaseException:
+            if on_done is not None:
+                on_done()
+            raise
+        self._in_flight += 1
+        self._publish_gauges()
+        future.add_done_callback(lambda _: self._schedule_release(loop, on_done))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self._job_timeout)
+        except asyncio.TimeoutError as exc:
+            # A running job cannot be interrupted; its slot is freed when it finishes.
+            if self._metrics:
+                self._metrics.increment_counter("image_processor.pool.timeouts")
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Image processing timed out",
+            ) from exc
+        except BrokenProcessPool as exc:
+            self._logger.error("image processing pool crashed, restarting")
+            self._reset_pool()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image processor is restarting, retry later",
+                headers={"Retry-After": str(self._retry_after)},
+            ) from exc
+
+    def shutdown(self) -> None:
+        """Stop the pool and drop queued jobs."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        try:
+            return self._ensure_pool().submit(func, *args)
+        except BrokenProcessPool:
+            self._reset_pool()
+            return self._ensure_pool().submit(func, *args)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            self._logger.info("image processing pool started", extra={"workers": self._workers})
+        return self._pool
+
+    def _reset_pool(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_release(
+        self, loop: asyncio.AbstractEventLoop, on_done: Optional[Callable[[], None]]
+    ) -> None:
+        # Done callbacks fire on the pool's management thread.
+        try:
+            loop.call_soon_threadsafe(self._release, on_done)
+        except RuntimeError:  # pragma: no cover - loop already closed during shutdown
+            pass
+
+    def _release(self, on_done: Optional[Callable[[], None]] = None) -> None:
+        self._in_flight = max(0, self._in_flight - 1)
+        self._publish_gauges()
+        if on_done is not None:
+            on_done()
+
+    def _publish_gauges(self) -> None:
+        if not self._metrics:
+            return
+        snapshot = self.stats()
+        self._metrics.set_gauge("image_processor.pool.workers", snapshot["workers"])
+        self._metrics.set_gauge("image_processor.pool.in_flight", snapshot["inFlight"])
+        self._metrics.set_gauge("image_processor.pool.queue_depth", snapshot["queueDepth"])
+        self._metrics.set_gauge("image_processor.pool.utilisation", snapshot["utilisation"])
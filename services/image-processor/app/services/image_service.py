@@ -3,22 +3,37 @@
 import base64
 import io
 import logging
+import math
 import re
 import time
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields, replace
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Sequence
 
 from fastapi import HTTPException
-from PIL import Image, ImageFilter, ImageOps
+from PIL import ExifTags, Image, ImageOps
 
 from app.config import config
 from app.models import (
     AdjustmentOptions,
     AppliedOptions,
+    ImageBatchRequest,
+    ImageBatchResponse,
     ImageProcessRequest,
     ImageProcessResponse,
     ImageUploadParams,
+    RenditionResponse,
+    RenditionSpec,
     ResizeOptions,
 )
+from app.services.adjustments import run_adjustments
+from app.services.animation import FrameStream, check_frame_budget, encode_animated_webp
+from app.services.ingest import inspect_base64, sniff_image, validate_sniffed
+
+# Let Pillow's own decompression-bomb check enforce the configured input limit
+# for every decode path, including ones that skip ingestion (e.g. precompute).
+Image.MAX_IMAGE_PIXELS = config.max_input_pixels
 
 
 def _normalize_hex_color(value: Optional[str]) -> Optional[str]:
@@ -51,32 +66,343 @@ def _canonical_format(value: Optional[str]) -> str:
     return normalized
 
 
+@dataclass(frozen=True)
+class ResamplePolicy:
+    """Quality/speed trade-off for downscaling."""
+
+    draft_headroom: Optional[float]
+    reducing_gap: Optional[float]
+    resample: Image.Resampling
+
+
+RESAMPLE_POLICIES: Dict[str, ResamplePolicy] = {
+    "quality": ResamplePolicy(draft_headroom=None, reducing_gap=None, resample=Image.Resampling.LANCZOS),
+    "balanced": ResamplePolicy(draft_headroom=2.0, reducing_gap=3.0, resample=Image.Resampling.LANCZOS),
+    "speed": ResamplePolicy(draft_headroom=1.0, reducing_gap=2.0, resample=Image.Resampling.BICUBIC),
+}
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """Encoder effort settings per output format (CPU time vs output size)."""
+
+    jpeg_optimize: bool
+    jpeg_progressive: bool
+    webp_method: int
+    png_optimize: bool
+    png_compress_level: int
+
+
+ENCODER_PROFILES: Dict[str, EncoderProfile] = {
+    "realtime": EncoderProfile(
+        jpeg_optimize=False, jpeg_progressive=False, webp_method=2, png_optimize=False, png_compress_level=1
+    ),
+    "balanced": EncoderProfile(
+        jpeg_optimize=True, jpeg_progressive=True, webp_method=4, png_optimize=False, png_compress_level=6
+    ),
+    "archival": EncoderProfile(
+        jpeg_optimize=True, jpeg_progressive=True, webp_method=6, png_optimize=True, png_compress_level=9
+    ),
+}
+
+# libwebp's animation encoder tries keyframe and delta candidates for every frame,
+# so method 6 costs several times method 4 there without making the output smaller.
+_ANIMATED_WEBP_MAX_METHOD = 4
+
+# EXIF orientations that rotate the image by 90 degrees.
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Transpose per EXIF orientation (as in ImageOps.exif_transpose), applied to animation frames.
+_ORIENTATION_TRANSPOSE: Dict[int, Image.Transpose] = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+def _contain_size(source: tuple[int, int], target: tuple[int, int]) -> tuple[int, int]:
+    """Largest size with the source aspect ratio that fits the target box (ImageOps.contain)."""
+    width, height = source
+    target_width, target_height = target
+    source_ratio = width / height
+    target_ratio = target_width / target_height
+    if source_ratio > target_ratio:
+        return target_width, max(1, round(height / width * target_width))
+    if source_ratio < target_ratio:
+        return max(1, round(width / height * target_height)), target_height
+    return target_width, target_height
+
+
+# Horizontal and vertical placement (0 = left/top, 1 = right/bottom) per ResizeOptions.position.
+_ANCHORS: Dict[str, tuple[float, float]] = {
+    "center": (0.5, 0.5),
+    "top": (0.5, 0.0),
+    "bottom": (0.5, 1.0),
+    "left": (0.0, 0.5),
+    "right": (1.0, 0.5),
+    "top-left": (0.0, 0.0),
+    "top-right": (1.0, 0.0),
+    "bottom-left": (0.0, 1.0),
+    "bottom-right": (1.0, 1.0),
+}
+
+# Pad canvas colour when neither the request nor the config sets a background.
+_DEFAULT_PAD_BACKGROUND = "#FFFFFFFF"
+
+
+def _anchor(position: Optional[str]) -> tuple[float, float]:
+    return _ANCHORS.get(position or "center", _ANCHORS["center"])
+
+
+def _cover_box(
+    source: tuple[int, int], target: tuple[int, int], position: Optional[str] = None
+) -> tuple[float, float, float, float]:
+    """Source region with the target aspect ratio, placed at the anchor (ImageOps.fit)."""
+    width, height = source
+    target_ratio = target[0] / target[1]
+    if width / height >= target_ratio:
+        crop_width, crop_height = target_ratio * height, float(height)
+    else:
+        crop_width, crop_height = float(width), width / target_ratio
+    anchor_x, anchor_y = _anchor(position)
+    left = (width - crop_width) * anchor_x
+    top = (height - crop_height) * anchor_y
+    return left, top, left + crop_width, top + crop_height
+
+
+def _hex_to_rgba(value: str) -> tuple[int, int, int, int]:
+    """Convert a normalized ``#RRGGBBAA`` colour to a tuple."""
+    return tuple(int(value[index : index + 2], 16) for index in (1, 3, 5, 7))  # type: ignore[return-value]
+
+
+def _required_source_size(
+    source: tuple[int, int], target: tuple[int, int], mode: str
+) -> tuple[int, int]:
+    """Smallest decoded size that still covers the requested output."""
+    width, height = source
+    if mode in {"fill", "stretch"}:
+        return target
+    scales = (target[0] / width, target[1] / height)
+    scale = max(scales) if mode == "cover" else min(scales)
+    return max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))
+
+
+class ImageProcessingError(Exception):
+    """Picklable carrier for HTTP errors raised inside pool workers."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass(frozen=True)
+class ProcessedImage:
+    """Encoded output of a single pipeline run.
+
+    ``data`` is a read-only view of the encoder's buffer rather than a copy
+    of it; results unpickled from a pool worker carry plain ``bytes``.
+    """
+
+    data: bytes | memoryview
+    width: int
+    height: int
+    format: str
+    source_format: str
+    applied: AppliedOptions
+    # Per-stage wall time in ms (decode, orient, resize, adjust, encode, base64.*)
+    # spent on the request that returned this result.
+    timings: Dict[str, float] = field(default_factory=dict, compare=False)
+    cached: bool = field(default=False, compare=False)
+    frames: int = 1
+
+    def __reduce__(self):
+        # A memoryview cannot be pickled; send it across the pool boundary as bytes.
+        values = [getattr(self, item.name) for item in fields(self)]
+        values[0] = bytes(self.data)
+        return (ProcessedImage, tuple(values))
+
+
+_worker_processor: Optional["ImageProcessor"] = None
+
+
+def render_image(
+    raw_bytes: bytes,
+    resize: ResizeOptions | None,
+    quality: Optional[int],
+    output_format: Optional[str],
+    adjustments: AdjustmentOptions | None,
+    profile: Optional[str] = None,
+) -> ProcessedImage:
+    """Pool entry point: run the CPU-bound pipeline in a worker process."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ImageProcessor(logging.getLogger("tzona.image_processor.worker"), None)
+    try:
+        return _worker_processor.render(
+            raw_bytes,
+            resize,
+            quality=quality,
+            output_format=output_format,
+            adjustments=adjustments,
+            profile=profile,
+        )
+    except HTTPException as exc:
+        raise ImageProcessingError(exc.status_code, str(exc.detail)) from None
+
+
+def render_renditions(
+    raw_bytes: bytes, specs: list[RenditionSpec], parallel: bool
+) -> list[ProcessedImage]:
+    """Pool entry point for batch renditions."""
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = ImageProcessor(logging.getLogger("tzona.image_processor.worker"), None)
+    try:
+        return _worker_processor.render_renditions(raw_bytes, specs, parallel=parallel)
+    except HTTPException as exc:
+        raise ImageProcessingError(exc.status_code, str(exc.detail)) from None
+
+
 class ImageProcessor:
     """Handles image processing operations."""
 
-    def __init__(self, logger: logging.Logger, metrics_recorder) -> None:
+    def __init__(
+        self, logger: logging.Logger, metrics_recorder, executor=None, cache=None, budget=None
+    ) -> None:
         self._logger = logger
         self._metrics = metrics_recorder
+        self._executor = executor
+        self._cache = cache
+        self._budget = budget
 
-    async def process_base64(self, request: ImageProcessRequest) -> ImageProcessResponse:
+    async def process_base64(self, request: ImageProcessRequest) -> ProcessedImage:
         """Process base64 encoded image."""
+        started = time.perf_counter()
         raw_bytes = self._decode_image(request.image)
-        return self._process_bytes(
+        decode_ms = (time.perf_counter() - started) * 1000
+        result = await self._process_bytes(
             raw_bytes,
             request.resize,
             quality=request.quality,
             output_format=request.format,
             adjustments=request.adjustments,
+            profile=request.profile,
         )
+        result.timings["base64.decode"] = decode_ms
+        self._observe_stages(result, {"base64.decode": decode_ms})
+        return result
 
-    async def process_upload(self, content: bytes, params: ImageUploadParams) -> ImageProcessResponse:
+    async def process_upload(self, content: bytes, params: ImageUploadParams) -> ProcessedImage:
         """Process uploaded file."""
-        return self._process_bytes(
+        return await self._process_bytes(
             content,
             params.resize_options(),
             quality=params.quality,
             output_format=params.outputFormat,
             adjustments=params.adjustment_options(),
+            profile=params.profile,
+        )
+
+    async def process_batch(self, request: ImageBatchRequest) -> ImageBatchResponse:
+        """Produce several renditions of one base64 encoded image."""
+        if len(request.renditions) > config.batch_max_renditions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {config.batch_max_renditions} renditions are allowed per request",
+            )
+        started_at = time.perf_counter()
+        raw_bytes = self._decode_image(request.image)
+        decode_ms = (time.perf_counter() - started_at) * 1000
+        specs = request.renditions
+        try:
+            results: list[Optional[ProcessedImage]] = [None] * len(specs)
+            keys: list[Optional[str]] = [None] * len(specs)
+            if self._cache is not None:
+                for index, spec in enumerate(specs):
+                    keys[index] = await self._cache.key_for(
+                        raw_bytes,
+                        self._canonical_options(
+                            spec.resize,
+                            quality=spec.quality,
+                            output_format=spec.format,
+                            adjustments=spec.adjustments,
+                            profile=spec.profile,
+                        ),
+                    )
+                    cached = await self._cache.get(keys[index])
+                    if cached is not None:
+                        results[index] = replace(cached, timings={}, cached=True)
+            missing = [index for index, result in enumerate(results) if result is None]
+            if missing:
+                rendered = await self._dispatch(
+                    render_renditions,
+                    raw_bytes,
+                    [specs[index] for index in missing],
+                    request.parallel,
+                    source=raw_bytes,
+                )
+                for index, result in zip(missing, rendered):
+                    self._observe_stages(result, result.timings)
+                    if keys[index] is not None:
+                        await self._cache.put(keys[index], result)
+                    results[index] = replace(result, timings=dict(result.timings))
+
+            if results[0] is not None:
+                results[0].timings["base64.decode"] = decode_ms
+                self._observe_stages(results[0], {"base64.decode": decode_ms})
+            renditions = [
+                RenditionResponse(name=spec.name, **self.to_response(result).model_dump())
+                for spec, result in zip(specs, results)
+                if result is not None
+            ]
+            size = sum(rendition.size for rendition in renditions)
+            self._logger.info(
+                "processed image batch",
+                extra={"renditions": len(renditions), "rendered": len(missing), "size": size},
+            )
+            if self._metrics:
+                self._metrics.increment_counter("image_processor.bytes_in", len(raw_bytes))
+                self._metrics.increment_counter("image_processor.bytes_out", size)
+                self._metrics.increment_counter("image_processor.renditions", len(renditions))
+                self._metrics.observe_operation(
+                    "optimize_batch",
+                    duration_ms=(time.perf_counter() - started_at) * 1000,
+                    success=True,
+                    metadata={"renditions": len(renditions), "rendered": len(missing)},
+                )
+            return ImageBatchResponse(renditions=renditions)
+        except Exception as exc:
+            if self._metrics:
+                self._metrics.observe_operation(
+                    "optimize_batch",
+                    duration_ms=(time.perf_counter() - started_at) * 1000,
+                    success=False,
+                    error=str(exc),
+                    metadata={"bytes_in": len(raw_bytes), "renditions": len(specs)},
+                )
+            raise
+
+    def to_response(self, result: ProcessedImage) -> ImageProcessResponse:
+        """Wrap a processed image into the JSON (base64) response model."""
+        started = time.perf_counter()
+        encoded = base64.b64encode(result.data).decode("ascii")
+        encode_ms = (time.perf_counter() - started) * 1000
+        result.timings["base64.encode"] = encode_ms
+        self._observe_stages(result, {"base64.encode": encode_ms})
+        return ImageProcessResponse(
+            processedImage=encoded,
+            width=result.width,
+            height=result.height,
+            format=f"image/{result.format.lower()}",
+            size=len(result.data),
+            optimized=True,
+            options=result.applied,
+            frames=result.frames,
         )
 
     def _decode_image(self, data: str) -> bytes:
@@ -87,20 +413,80 @@ class ImageProcessor:
             except ValueError as exc:
                 raise HTTPException(status_code=400, detail="Invalid data URI") from exc
             data = encoded
+        inspect_base64(data)
         try:
             return base64.b64decode(data, validate=True)
         except Exception as exc:
             raise HTTPException(status_code=400, detail="Image is not valid base64") from exc
 
-    def _open_image(self, raw_bytes: bytes) -> Image.Image:
-        """Open and orient image from bytes."""
+    def _open_image(
+        self,
+        raw_bytes: bytes,
+        targets: Sequence[tuple[tuple[int, int], str]] = (),
+        timings: Optional[Dict[str, float]] = None,
+        *,
+        keep_animation: bool = False,
+    ) -> Image.Image:
+        """Open and orient image from bytes, letting the decoder downscale when possible.
+
+        With ``keep_animation`` an animated source is returned undecoded so its
+        frames can be streamed; anything else is decoded to its first frame.
+        """
         try:
+            started = time.perf_counter()
             image = Image.open(io.BytesIO(raw_bytes))
+            source_format = image.format
+            if image.width * image.height > config.max_input_pixels:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Image has {image.width * image.height} pixels, the limit is {config.max_input_pixels}",
+                )
+            if keep_animation and getattr(image, "is_animated", False):
+                return image
+            if targets:
+                self._apply_draft(image, targets)
+            image.load()
+            oriented_at = time.perf_counter()
             image = ImageOps.exif_transpose(image)
+            # exif_transpose returns a copy, which drops the decoder's format.
+            image.format = image.format or source_format
+            if timings is not None:
+                timings["decode"] = (oriented_at - started) * 1000
+                timings["orient"] = (time.perf_counter() - oriented_at) * 1000
             return image
+        except HTTPException:
+            raise
+        except Image.DecompressionBombError as exc:
+            raise HTTPException(status_code=413, detail="Image dimensions exceed the allowed pixel count") from exc
         except Exception as exc:
             raise HTTPException(status_code=400, detail="Unsupported or corrupt image") from exc
 
+    def _apply_draft(self, image: Image.Image, targets: Sequence[tuple[tuple[int, int], str]]) -> None:
+        """Ask the JPEG decoder for a 1/2, 1/4 or 1/8 scale decode that still covers every target."""
+        policy = RESAMPLE_POLICIES[config.resample_policy]
+        if policy.draft_headroom is None or image.format != "JPEG":
+            return
+        transposed = image.getexif().get(ExifTags.Base.Orientation) in _TRANSPOSED_ORIENTATIONS
+        required_width = required_height = 0
+        for target, mode in targets:
+            if transposed:
+                target = (target[1], target[0])
+            width, height = _required_source_size(image.size, target, mode)
+            required_width, required_height = max(required_width, width), max(required_height, height)
+        requested = (
+            math.ceil(required_width * policy.draft_headroom),
+            math.ceil(required_height * policy.draft_headroom),
+        )
+        if requested[0] < image.width and requested[1] < image.height:
+            image.draft(image.mode, requested)
+
+    def _target_box(self, options: ResizeOptions | None) -> tuple[int, int]:
+        """Clamp the requested box to the configured limits."""
+        return (
+            config.clamp_dimension(options.maxWidth if options else None, config.default_max_width),
+            config.clamp_dimension(options.maxHeight if options else None, config.default_max_height),
+        )
+
     def _resolve_output_format(self, candidate: Optional[str]) -> str:
         """Resolve and validate output format."""
         normalized = _canonical_format(candidate) or config.default_format
@@ -111,11 +497,55 @@ class ImageProcessor:
             )
         return normalized
 
-    def _resize_image(self, image: Image.Image, options: ResizeOptions | None) -> tuple[Image.Image, AppliedOptions]:
-        """Resize image according to options."""
-        width = config.clamp_dimension(options.maxWidth if options else None, config.default_max_width)
-        height = config.clamp_dimension(options.maxHeight if options else None, config.default_max_height)
-        
+    def _resolve_profile(self, candidate: Optional[str]) -> str:
+        """Resolve and validate the encoder profile."""
+        normalized = (candidate or config.encoder_profile).strip().lower()
+        if normalized not in ENCODER_PROFILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Encoder profile '{normalized}' is not supported",
+            )
+        return normalized
+
+    def _resolve_mode(self, options: ResizeOptions | None) -> str:
+        """Resolve the resize mode, falling back to the configured default."""
+        return (options.mode if options and options.mode else config.default_mode).strip().lower()
+
+    def _resolve_background(self, options: ResizeOptions | None) -> Optional[str]:
+        """Resolve the normalized background colour."""
+        return _normalize_hex_color(options.background if options else None) or config.default_background
+
+    def _canonical_options(
+        self,
+        resize: ResizeOptions | None,
+        *,
+        quality: Optional[int],
+        output_format: Optional[str],
+        adjustments: AdjustmentOptions | None,
+        profile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Resolve request options into the canonical form used for cache keys."""
+        applied = AppliedOptions(
+            mode=self._resolve_mode(resize),
+            quality=config.clamp_quality(quality),
+            background=self._resolve_background(resize),
+            format=f"image/{self._resolve_output_format(output_format).lower()}",
+            adjustments=adjustments or AdjustmentOptions(stripMetadata=config.default_strip_metadata),
+            profile=self._resolve_profile(profile),
+        )
+        return {
+            "options": applied.model_dump(),
+            "box": list(self._target_box(resize)),
+            "position": resize.position if resize else None,
+            "resamplePolicy": config.resample_policy,
+        }
+
+    def _resize_image(
+        self, image: Image.Image, options: ResizeOptions | None, *, canvas: Optional[Image.Image] = None
+    ) -> tuple[Image.Image, AppliedOptions]:
+        """Resize image according to options; ``canvas`` is a pad canvas that may be repainted and reused."""
+        width, height = self._target_box(options)
+
         if width is None and height is None:
             return image, AppliedOptions(
                 mode=config.default_mode,
@@ -127,19 +557,31 @@ class ImageProcessor:
 
         target_width = width or image.width
         target_height = height or image.height
-        mode = (options.mode if options and options.mode else config.default_mode).strip().lower()
-        background = _normalize_hex_color(options.background if options else None) or config.default_background
+        mode = self._resolve_mode(options)
+        background = self._resolve_background(options)
+        position = options.position if options else None
+
+        target = (target_width, target_height)
+        policy = RESAMPLE_POLICIES[config.resample_policy]
+        # reducing_gap lets Pillow shrink by an integer factor (box reduce) before the
+        # final resampling pass, so LANCZOS only runs over a few times the output size.
+        gap = policy.reducing_gap
 
         if mode == "contain":
-            resized = ImageOps.contain(image, (target_width, target_height), Image.Resampling.LANCZOS)
+            resized = image.resize(_contain_size(image.size, target), policy.resample, reducing_gap=gap)
         elif mode == "cover":
-            resized = ImageOps.fit(image, (target_width, target_height), Image.Resampling.LANCZOS)
+            # The crop box is handed to resize, so pixels outside it are never resampled.
+            resized = image.resize(
+                target, policy.resample, box=_cover_box(image.size, target, position), reducing_gap=gap
+            )
         elif mode == "fill":
-            resized = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+            resized = image.resize(target, policy.resample, reducing_gap=gap)
         elif mode == "stretch":
-            resized = image.resize((target_width, target_height), Image.Resampling.BICUBIC)
+            resized = image.resize(target, Image.Resampling.BICUBIC, reducing_gap=gap)
         else:  # pad
-            resized = ImageOps.contain(image, (target_width, target_height), Image.Resampling.LANCZOS)
+            background = background or _DEFAULT_PAD_BACKGROUND
+            contained = image.resize(_contain_size(image.size, target), policy.resample, reducing_gap=gap)
+            resized = self._composite(contained, target, background, position, canvas=canvas)
 
         return resized, AppliedOptions(
             mode=mode,
@@ -149,24 +591,58 @@ class ImageProcessor:
             adjustments=AdjustmentOptions(stripMetadata=config.default_strip_metadata),
         )
 
+    def _composite(
+        self,
+        image: Image.Image,
+        canvas_size: tuple[int, int],
+        background: str,
+        position: Optional[str],
+        *,
+        canvas: Optional[Image.Image] = None,
+    ) -> Image.Image:
+        """Place an already resized image on a background canvas at the anchor."""
+        if image.size == canvas_size:
+            return image
+        fill = _hex_to_rgba(background)
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        canvas_mode = "RGBA" if has_alpha or fill[3] < 255 else "RGB"
+        colour = fill if canvas_mode == "RGBA" else fill[:3]
+        if canvas is not None and canvas.size == canvas_size and canvas.mode == canvas_mode:
+            canvas.paste(colour, (0, 0, *canvas_size))
+        else:
+            canvas = Image.new(canvas_mode, canvas_size, colour)
+        anchor_x, anchor_y = _anchor(position)
+        offset = (
+            round((canvas_size[0] - image.width) * anchor_x),
+            round((canvas_size[1] - image.height) * anchor_y),
+        )
+        if canvas_mode == "RGBA":
+            canvas.alpha_composite(image.convert("RGBA"), offset)
+        else:
+            canvas.paste(image.convert("RGB"), offset)
+        canvas.info = {key: value for key, value in image.info.items() if key != "transparency"}
+        return canvas
+
     def _apply_adjustments(
         self, image: Image.Image, adjustments: AdjustmentOptions | None, applied: AppliedOptions
-    ) -> tuple[Image.Image, AppliedOptions]:
+    ) -> tuple[Image.Image, AppliedOptions, Dict[str, float]]:
         """Apply image adjustments."""
         if not adjustments:
-            return image, applied
-        updated = image
+            return image, applied, {}
         if adjustments.stripMetadata:
-            updated.info.clear()
-        if adjustments.grayscale:
-            updated = ImageOps.grayscale(updated).convert("RGB")
-        if adjustments.sharpen:
-            updated = updated.filter(ImageFilter.UnsharpMask(radius=1.2, percent=150, threshold=3))
+            if "transparency" in image.info:
+                # Palette and colour-key transparency live in ``info``; keep them as an alpha band.
+                image = image.convert("LA" if image.mode == "L" else "RGBA")
+            image.info.clear()
+        updated, timings = run_adjustments(image, adjustments)
         applied.adjustments = adjustments
-        return updated, applied
+        return updated, applied, timings
 
-    def _encode_image(self, image: Image.Image, *, quality: Optional[int], output_format: str) -> tuple[str, int]:
-        """Encode image to base64."""
+    def _encode_image(
+        self, image: Image.Image, *, quality: Optional[int], output_format: str, profile: str
+    ) -> memoryview:
+        """Encode image to the target format with the given encoder profile, without copying the buffer."""
+        settings = ENCODER_PROFILES[profile]
         normalized_quality = config.clamp_quality(quality)
         buffer = io.BytesIO()
         params: dict[str, object] = {"format": output_format}
@@ -175,22 +651,21 @@ class ImageProcessor:
         if output_format == "JPEG":
             if image.mode not in ("RGB", "L"):
                 image = image.convert("RGB")
-            params["optimize"] = True
-            params["progressive"] = True
+            params["optimize"] = settings.jpeg_optimize
+            params["progressive"] = settings.jpeg_progressive
         elif output_format == "WEBP":
             if image.mode not in ("RGB", "RGBA"):
                 image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
-            params["method"] = 6
+            params["method"] = settings.webp_method
         elif output_format == "PNG":
             if image.mode == "P":
                 image = image.convert("RGBA")
-            params["optimize"] = True
-            params["compress_level"] = 9
+            params["optimize"] = settings.png_optimize
+            params["compress_level"] = settings.png_compress_level
         image.save(buffer, **params)
-        payload = base64.b64encode(buffer.getvalue()).decode("ascii")
-        return payload, buffer.tell()
+        return buffer.getbuffer().toreadonly()
 
-    def _process_bytes(
+    def render(
         self,
         raw_bytes: bytes,
         resize: ResizeOptions | None,
@@ -198,35 +673,342 @@ class ImageProcessor:
         quality: Optional[int],
         output_format: Optional[str],
         adjustments: AdjustmentOptions | None,
-    ) -> ImageProcessResponse:
-        """Core image processing logic."""
-        started_at = time.perf_counter()
-        inbound_size = len(raw_bytes)
+        profile: Optional[str] = None,
+    ) -> ProcessedImage:
+        """Decode, transform and encode an image synchronously."""
+        requested_format = self._resolve_output_format(output_format)
+        requested_profile = self._resolve_profile(profile)
+        timings: Dict[str, float] = {}
+        source_image = self._open_image(
+            raw_bytes,
+            [(self._target_box(resize), self._resolve_mode(resize))],
+            timings,
+            keep_animation=requested_format == "WEBP",
+        )
+        if getattr(source_image, "is_animated", False):
+            return self._render_animation(
+                source_image, resize, adjustments, quality=quality, profile=requested_profile
+            )
+        adjusted, applied, stage_timings = self._transform(source_image, resize, adjustments)
+        timings.update(stage_timings)
+        return self._finish(
+            adjusted,
+            applied,
+            quality=quality,
+            output_format=requested_format,
+            profile=requested_profile,
+            source_format=source_image.format,
+            timings=timings,
+        )
+
+    def render_renditions(
+        self, raw_bytes: bytes, specs: Sequence[RenditionSpec], *, parallel: bool
+    ) -> list[ProcessedImage]:
+        """Decode once and derive every rendition from progressively smaller intermediates.
+
+        Renditions are produced largest-first. Before each one the current
+        intermediate is box-reduced by an integer factor while it stays at
+        least twice the size that rendition needs, so smaller outputs never
+        resample the full-resolution source. With ``parallel`` the encodes,
+        which release the GIL, run on a small thread pool.
+        """
+        formats = [self._resolve_output_format(spec.format) for spec in specs]
+        profiles = [self._resolve_profile(spec.profile) for spec in specs]
+        targets = [(self._target_box(spec.resize), self._resolve_mode(spec.resize)) for spec in specs]
+        # Decode and orient happen once; their timings are attributed to the first rendition.
+        shared_timings: Dict[str, float] = {}
+        source_image = self._open_image(raw_bytes, targets, shared_timings)
+        source_format = source_image.format
+
+        def _required_area(index: int) -> int:
+            width, height = _required_source_size(source_image.size, *targets[index])
+            return width * height
+
+        order = sorted(range(len(specs)), key=_required_area, reverse=True)
+        results: list[Optional[ProcessedImage]] = [None] * len(specs)
+        pending: dict[int, Future] = {}
+        pool = ThreadPoolExecutor(max_workers=config.batch_threads) if parallel and len(specs) > 1 else None
         try:
-            source_image = self._open_image(raw_bytes)
-            requested_format = self._resolve_output_format(output_format)
-            resized, applied = self._resize_image(source_image, resize)
-            adjusted, applied = self._apply_adjustments(resized, adjustments, applied)
+            intermediate = source_image
+            for index in order:
+                spec = specs[index]
+                reduce_started = time.perf_counter()
+                required = _required_source_size(intermediate.size, *targets[index])
+                factor = min(intermediate.width // (2 * required[0]), intermediate.height // (2 * required[1]))
+                if factor >= 2 and intermediate.mode not in {"P", "1"}:
+                    intermediate = intermediate.reduce(factor)
+                reduce_ms = (time.perf_counter() - reduce_started) * 1000
+                adjusted, applied, timings = self._transform(intermediate, spec.resize, spec.adjustments)
+                timings["resize"] += reduce_ms
+                timings = {**shared_timings, **timings}
+                shared_timings = {}
+                finish = partial(
+                    self._finish,
+                    adjusted,
+                    applied,
+                    quality=spec.quality,
+                    output_format=formats[index],
+                    profile=profiles[index],
+                    source_format=source_format,
+                    timings=timings,
+                )
+                if pool is None:
+                    results[index] = finish()
+                else:
+                    pending[index] = pool.submit(finish)
+            for index, future in pending.items():
+                results[index] = future.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return [result for result in results if result is not None]
+
+    def _render_animation(
+        self,
+        source: Image.Image,
+        resize: ResizeOptions | None,
+        adjustments: AdjustmentOptions | None,
+        *,
+        quality: Optional[int],
+        profile: str,
+    ) -> ProcessedImage:
+        """Stream an animated source frame by frame into an animated WebP.
+
+        Each frame is decoded, resized, adjusted and passed to the encoder
+        before the next one is read, and pad layouts repaint one canvas
+        instead of allocating a new one per frame.
+        """
+        try:
+            frames = check_frame_budget(source)
+            transpose = _ORIENTATION_TRANSPOSE.get(source.getexif().get(ExifTags.Base.Orientation))
+            timings = {"decode": 0.0, "resize": 0.0, "adjust": 0.0}
+            state: Dict[str, Any] = {"canvas": None, "applied": None}
+
+            def render_frame(frame: Image.Image) -> Image.Image:
+                started = time.perf_counter()
+                frame.load()
+                if frame.mode not in ("RGB", "RGBA"):
+                    frame = frame.convert("RGBA" if frame.has_transparency_data else "RGB")
+                elif frame.mode == "RGBA" and frame.getchannel("A").getextrema()[0] == 255:
+                    # Animated WebP frames decode as RGBA even when opaque; resampling
+                    # and encoding three bands is markedly cheaper than premultiplied four.
+                    frame = frame.convert("RGB")
+                if transpose is not None:
+                    frame = frame.transpose(transpose)
+                decoded_at = time.perf_counter()
+                resized, applied = self._resize_image(frame, resize, canvas=state["canvas"])
+                if applied.mode == "pad":
+                    state["canvas"] = resized
+                resized_at = time.perf_counter()
+                adjusted, state["applied"], _ = self._apply_adjustments(resized, adjustments, applied)
+                timings["decode"] += (decoded_at - started) * 1000
+                timings["resize"] += (resized_at - decoded_at) * 1000
+                timings["adjust"] += (time.perf_counter() - resized_at) * 1000
+                return adjusted
+
+            started = time.perf_counter()
+            stream = FrameStream(source, render_frame)
             normalized_quality = config.clamp_quality(quality)
-            encoded, size = self._encode_image(
-                adjusted,
+            encoded = encode_animated_webp(
+                stream,
                 quality=normalized_quality,
-                output_format=requested_format,
+                method=min(ENCODER_PROFILES[profile].webp_method, _ANIMATED_WEBP_MAX_METHOD),
+                loop=int(source.info.get("loop", 0)),
             )
-            source_format = _canonical_format(source_image.format) or "UNKNOWN"
-            applied.quality = normalized_quality
-            applied.format = f"image/{requested_format.lower()}"
-            
+        except HTTPException:
+            raise
+        except Image.DecompressionBombError as exc:
+            raise HTTPException(status_code=413, detail="Image dimensions exceed the allowed pixel count") from exc
+        except Exception as exc:
+            raise HTTPException(status_code=400, detail="Unsupported or corrupt animation") from exc
+        # Frame work happens inside the encoder loop; the remainder is encoding.
+        frame_ms = timings["decode"] + timings["resize"] + timings["adjust"]
+        timings["encode"] = (time.perf_counter() - started) * 1000 - frame_ms
+        applied = state["applied"]
+        applied.quality = normalized_quality
+        applied.profile = profile
+        applied.format = "image/webp"
+        return ProcessedImage(
+            data=encoded,
+            width=stream.width,
+            height=stream.height,
+            format="WEBP",
+            source_format=_canonical_format(source.format) or "UNKNOWN",
+            applied=applied,
+            timings=timings,
+            frames=frames,
+        )
+
+    def _transform(
+        self, image: Image.Image, resize: ResizeOptions | None, adjustments: AdjustmentOptions | None
+    ) -> tuple[Image.Image, AppliedOptions, Dict[str, float]]:
+        """Resize and adjust a decoded image."""
+        started = time.perf_counter()
+        resized, applied = self._resize_image(image, resize)
+        resized_at = time.perf_counter()
+        adjusted, applied, adjust_timings = self._apply_adjustments(resized, adjustments, applied)
+        timings = {
+            "resize": (resized_at - started) * 1000,
+            "adjust": (time.perf_counter() - resized_at) * 1000,
+            **adjust_timings,
+        }
+        return adjusted, applied, timings
+
+    def _finish(
+        self,
+        image: Image.Image,
+        applied: AppliedOptions,
+        *,
+        quality: Optional[int],
+        output_format: str,
+        profile: str,
+        source_format: Optional[str],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> ProcessedImage:
+        """Encode a transformed image and record the applied options."""
+        normalized_quality = config.clamp_quality(quality)
+        started = time.perf_counter()
+        encoded = self._encode_image(
+            image, quality=normalized_quality, output_format=output_format, profile=profile
+        )
+        timings = {**(timings or {}), "encode": (time.perf_counter() - started) * 1000}
+        applied.quality = normalized_quality
+        applied.profile = profile
+        applied.format = f"image/{output_format.lower()}"
+        return ProcessedImage(
+            data=encoded,
+            width=image.width,
+            height=image.height,
+            format=output_format,
+            source_format=_canonical_format(source_format) or "UNKNOWN",
+            applied=applied,
+            timings=timings,
+        )
+
+    async def _render(
+        self,
+        raw_bytes: bytes,
+        resize: ResizeOptions | None,
+        *,
+        quality: Optional[int],
+        output_format: Optional[str],
+        adjustments: AdjustmentOptions | None,
+        profile: Optional[str],
+    ) -> ProcessedImage:
+        """Run the single-image pipeline."""
+        return await self._dispatch(
+            render_image, raw_bytes, resize, quality, output_format, adjustments, profile, source=raw_bytes
+        )
+
+    async def _reserve(self, raw_bytes: bytes) -> Optional[Callable[[], None]]:
+        """Reserve the estimated decode memory from the budget, read from the header alone.
+
+        Pool capacity is checked first, so a request that would be rejected
+        anyway does not wait for, or hold up, budget memory.
+        """
+        if self._budget is None:
+            return None
+        sniffed = sniff_image(raw_bytes)
+        if sniffed is None:
+            raise HTTPException(status_code=400, detail="Unsupported or corrupt image")
+        decoded_bytes = validate_sniffed(sniffed).decoded_bytes
+        if self._executor is not None:
+            self._executor.check_capacity()
+        return await self._budget.acquire(decoded_bytes)
+
+    def _observe_stages(self, result: ProcessedImage, timings: Dict[str, float]) -> None:
+        """Record stage durations in the ``image_processor.stage_ms`` histogram."""
+        if not self._metrics:
+            return
+        labels = {
+            "source_format": result.source_format,
+            "target_format": result.format,
+            "mode": result.applied.mode,
+        }
+        for stage, duration_ms in timings.items():
+            self._metrics.observe_histogram(
+                "image_processor.stage_ms", duration_ms, labels={"stage": stage, **labels}
+            )
+
+    async def _dispatch(self, job: Callable[..., Any], *args: Any, source: Optional[bytes] = None) -> Any:
+        """Run a pool entry point on the process pool, or inline when no pool is configured.
+
+        The decode memory of ``source`` is reserved until the job has finished
+        in the pool, not just until the caller stops waiting: a timed-out job
+        keeps decoding.
+        """
+        release = await self._reserve(source) if source is not None else None
+        try:
+            if self._executor is None:
+                try:
+                    return job(*args)
+                finally:
+                    if release is not None:
+                        release()
+            return await self._executor.run(job, *args, on_done=release)
+        except ImageProcessingError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from None
+
+    async def _process_bytes(
+        self,
+        raw_bytes: bytes,
+        resize: ResizeOptions | None,
+        *,
+        quality: Optional[int],
+        output_format: Optional[str],
+        adjustments: AdjustmentOptions | None,
+        profile: Optional[str] = None,
+    ) -> ProcessedImage:
+        """Core image processing logic."""
+        started_at = time.perf_counter()
+        inbound_size = len(raw_bytes)
+        try:
+            cache_key: Optional[str] = None
+            result: Optional[ProcessedImage] = None
+            if self._cache is not None:
+                cache_key = await self._cache.key_for(
+                    raw_bytes,
+                    self._canonical_options(
+                        resize,
+                        quality=quality,
+                        output_format=output_format,
+                        adjustments=adjustments,
+                        profile=profile,
+                    ),
+                )
+                result = await self._cache.get(cache_key)
+            cached = result is not None
+            if cached:
+                # Hand out a per-request copy so request timings never touch the cached entry.
+                result = replace(result, timings={}, cached=True)
+            else:
+                result = await self._render(
+                    raw_bytes,
+                    resize,
+                    quality=quality,
+                    output_format=output_format,
+                    adjustments=adjustments,
+                    profile=profile,
+                )
+                self._observe_stages(result, result.timings)
+                if cache_key is not None:
+                    await self._cache.put(cache_key, result)
+                    result = replace(result, timings=dict(result.timings))
+            applied = result.applied
+            size = len(result.data)
+
             self._logger.info(
                 "processed image",
                 extra={
-                    "width": adjusted.width,
-                    "height": adjusted.height,
-                    "format": requested_format,
-                    "source_format": source_format,
+                    "width": result.width,
+                    "height": result.height,
+                    "format": result.format,
+                    "source_format": result.source_format,
                     "size": size,
-                    "quality": normalized_quality,
+                    "quality": applied.quality,
                     "mode": applied.mode,
+                    "profile": applied.profile,
+                    "cached": cached,
                 },
             )
             if self._metrics:
@@ -237,21 +1019,15 @@ class ImageProcessor:
                     duration_ms=(time.perf_counter() - started_at) * 1000,
                     success=True,
                     metadata={
-                        "format": requested_format,
+                        "format": result.format,
                         "mode": applied.mode,
-                        "width": adjusted.width,
-                        "height": adjusted.height,
+                        "profile": applied.profile,
+                        "width": result.width,
+                        "height": result.height,
+                        "cached": cached,
                     },
                 )
-            return ImageProcessResponse(
-                processedImage=encoded,
-                width=adjusted.width,
-                height=adjusted.height,
-                format=f"image/{requested_format.lower()}",
-                size=size,
-                optimized=True,
-                options=applied,
-            )
+            return result
         except Exception as exc:
             if self._metrics:
                 self._metrics.observe_operation(
@@ -0,0 +1,299 @@
+"""Bounded ingestion of image payloads.
+
+Uploads are parsed straight from the request stream into a spooled buffer.
+The image header is sniffed from the first bytes, so oversized or
+unsupported images are rejected before the rest of the body is read. JSON
+bodies carrying base64 images are capped while they are read, before
+FastAPI parses them.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import io
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from PIL import Image
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # pragma: no cover - python-multipart < 0.0.13
+    import multipart
+    from multipart.multipart import parse_options_header
+
+from app.config import config
+
+# Pillow stores multi-band images at 4 bytes per pixel; a second buffer of the
+# same size is held while orienting/converting before the resize shrinks it.
+_WORKING_COPIES = 2
+
+# Multipart framing (boundaries, part headers) allowed on top of the file itself.
+_MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+# JSON framing and request options allowed on top of the base64 image itself.
+_JSON_OVERHEAD_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class SniffedImage:
+    """Format and geometry read from an image header without decoding pixels."""
+
+    format: str
+    width: int
+    height: int
+    mode: str
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    @property
+    def decoded_bytes(self) -> int:
+        """Estimated peak memory needed to decode and orient this image."""
+        return estimate_decoded_bytes(self.width, self.height, self.mode)
+
+
+def estimate_decoded_bytes(width: int, height: int, mode: str) -> int:
+    """Estimate decoded pixel memory from the header's dimensions and mode."""
+    if mode in {"1", "L", "P"}:
+        bytes_per_pixel = 1
+    elif mode.startswith("I;16"):
+        bytes_per_pixel = 2
+    else:
+        bytes_per_pixel = 4
+    return width * height * bytes_per_pixel * _WORKING_COPIES
+
+
+@dataclass(frozen=True)
+class IngestedUpload:
+    """Validated upload body."""
+
+    data: bytes
+    image: SniffedImage
+    filename: Optional[str] = None
+
+
+def sniff_image(header: bytes) -> Optional[SniffedImage]:
+    """Read format and dimensions from the leading bytes, or None if more bytes are needed."""
+    try:
+        with Image.open(io.BytesIO(header)) as image:
+            return SniffedImage(
+                format=(image.format or "").upper(),
+                width=image.width,
+                height=image.height,
+                mode=image.mode,
+            )
+    except Image.DecompressionBombError as exc:
+        raise HTTPException(
+            status_code=413,
+            detail="Image dimensions exceed the allowed pixel count",
+        ) from exc
+    except Exception:
+        return None
+
+
+def validate_sniffed(image: SniffedImage) -> SniffedImage:
+    """Enforce the input format and pixel-count limits."""
+    if image.format not in config.allowed_input_formats:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Input format '{image.format or 'unknown'}' is not supported",
+        )
+    if image.pixels > config.max_input_pixels:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Image has {image.pixels} pixels, the limit is {config.max_input_pixels}",
+        )
+    return image
+
+
+def _reject_size(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Image payload of {size} bytes exceeds the {config.max_upload_bytes} byte limit",
+    )
+
+
+def max_json_body_bytes() -> int:
+    """Largest JSON body that can carry a base64 image within ``max_upload_bytes``."""
+    return -(-config.max_upload_bytes // 3) * 4 + _JSON_OVERHEAD_BYTES
+
+
+def _reject_body_size(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Request body of {size} bytes exceeds the {max_json_body_bytes()} byte limit",
+    )
+
+
+def _reject_unrecognised() -> HTTPException:
+    return HTTPException(
+        status_code=415,
+        detail="Unsupported or corrupt image",
+    )
+
+
+def inspect_base64(encoded: str) -> SniffedImage:
+    """Check the decoded size and header of a base64 payload before decoding all of it."""
+    estimated_size = len(encoded) // 4 * 3
+    if estimated_size > config.max_upload_bytes:
+        raise _reject_size(estimated_size)
+    # Decode only the sniff window; a multiple of 4 characters keeps it valid base64.
+    window = encoded[: (config.sniff_bytes // 3) * 4]
+    try:
+        header = base64.b64decode(window, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Image is not valid base64") from None
+    sniffed = sniff_image(header)
+    if sniffed is None:
+        raise _reject_unrecognised()
+    return validate_sniffed(sniffed)
+
+
+class _BoundedBodyRequest(Request):
+    """Request whose ``body()`` refuses a declared or streamed length over the JSON limit."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            limit = max_json_body_bytes()
+            declared = self.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > limit:
+                raise _reject_body_size(int(declared))
+            chunks = []
+            size = 0
+            async for chunk in self.stream():
+                size += len(chunk)
+                if size > limit:
+                    raise _reject_body_size(size)
+                chunks.append(chunk)
+            self._body = b"".join(chunks)
+        return self._body
+
+
+class BoundedBodyRoute(APIRoute):
+    """Route class that caps JSON bodies before FastAPI reads and validates them.
+
+    Without it a base64 payload is buffered and parsed in full before
+    ``inspect_base64`` can reject it. Streaming routes that never call
+    ``body()`` are unaffected.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def bounded_handler(request: Request) -> Response:
+            return await handler(_BoundedBodyRequest(request.scope, request.receive))
+
+        return bounded_handler
+
+
+class _MultipartCollector:
+    """python-multipart callbacks that spool a single file field."""
+
+    def __init__(self, field_name: str) -> None:
+        self.field_name = field_name
+        self.buffer = SpooledTemporaryFile(max_size=config.spool_bytes)
+        self.size = 0
+        self.found = False
+        self.filename: Optional[str] = None
+        self.header = bytearray()
+        self.sniffed: Optional[SniffedImage] = None
+        self._active = False
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._disposition: Optional[bytes] = None
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        }
+
+    def _on_part_begin(self) -> None:
+        self._disposition = None
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if bytes(self._header_field).lower() == b"content-disposition":
+            self._disposition = bytes(self._header_value)
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition or b"")
+        name = options.get(b"name", b"").decode("latin-1")
+        self._active = not self.found and name == self.field_name
+        if self._active:
+            self.found = True
+            filename = options.get(b"filename")
+            self.filename = filename.decode("utf-8", "replace") if filename else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._active:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > config.max_upload_bytes:
+            raise _reject_size(self.size)
+        if self.sniffed is None:
+            self.header += chunk[: max(0, config.sniff_bytes - len(self.header))]
+        self.buffer.write(chunk)
+
+    def _on_part_end(self) -> None:
+        self._active = False
+
+
+async def ingest_multipart(request: Request, field_name: str = "file") -> IngestedUpload:
+    """Stream a multipart upload, validating the image header as soon as it arrives."""
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit():
+        if int(declared) > config.max_upload_bytes + _MULTIPART_OVERHEAD_BYTES:
+            raise _reject_size(int(declared))
+
+    collector = _MultipartCollector(field_name)
+    parser = multipart.MultipartParser(boundary, collector.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if collector.sniffed is None and collector.header:
+                collector.sniffed = sniff_image(bytes(collector.header))
+                if collector.sniffed is not None:
+                    validate_sniffed(collector.sniffed)
+                elif len(collector.header) >= config.sniff_bytes:
+                    raise _reject_unrecognised()
+        parser.finalize()
+
+        if not collector.found:
+            raise HTTPException(status_code=400, detail=f"Multipart field '{field_name}' is required")
+        if collector.sniffed is None:
+            collector.sniffed = sniff_image(bytes(collector.header))
+            if collector.sniffed is None:
+                raise _reject_unrecognised()
+            validate_sniffed(collector.sniffed)
+
+        collector.buffer.seek(0)
+        data = collector.buffer.read()
+    finally:
+        collector.buffer.close()
+    return IngestedUpload(data=data, image=collector.sniffed, filename=collector.filename)
@@ -0,0 +1,122 @@
+"""Global budget for the memory held by decoded images in flight."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Set
+
+from fastapi import HTTPException
+from starlette import status
+
+
+class DecodeBudget:
+    """Admits decodes while their estimated pixel memory fits the budget.
+
+    Requests that would overflow the budget wait up to ``wait_seconds`` for
+    memory to be released and are rejected with 503 and ``Retry-After``
+    afterwards. A single image larger than the whole budget is rejected with
+    413 straight away, since it could never be admitted. Memory is returned
+    through the callable ``acquire`` hands out, so it can stay reserved until
+    the pool job that decodes the image has actually finished.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        wait_seconds: float,
+        retry_after_seconds: int,
+        logger: logging.Logger,
+        metrics_recorder=None,
+    ) -> None:
+        self._max_bytes = max(1, max_bytes)
+        self._wait_seconds = max(0.0, wait_seconds)
+        self._retry_after = retry_after_seconds
+        self._logger = logger
+        self._metrics = metrics_recorder
+        self._used_bytes = 0
+        self._waiters = 0
+        self._condition = asyncio.Condition()
+        self._releases: Set[asyncio.Task[None]] = set()
+        self._publish_gauges()
+
+    @property
+    def saturated(self) -> bool:
+        return self._waiters > 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current budget usage."""
+        return {
+            "budgetBytes": self._max_bytes,
+            "usedBytes": self._used_bytes,
+            "waiters": self._waiters,
+            "utilisation": round(self._used_bytes / self._max_bytes, 3),
+            "waitSeconds": self._wait_seconds,
+        }
+
+    async def acquire(self, nbytes: int) -> Callable[[], None]:
+        """Take ``nbytes`` of the budget; call the returned function (on the loop) to give it back."""
+        if nbytes > self._max_bytes:
+            if self._metrics:
+                self._metrics.increment_counter("image_processor.decode_budget.too_large")
+            raise HTTPException(
+                status_code=413,
+                detail=f"Decoding this image needs ~{nbytes} bytes, more than the {self._max_bytes} byte budget",
+            )
+        await self._acquire(nbytes)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            task = asyncio.get_running_loop().create_task(self._release(nbytes))
+            self._releases.add(task)
+            task.add_done_callback(self._releases.discard)
+
+        return release
+
+    async def _acquire(self, nbytes: int) -> None:
+        async with self._condition:
+            if self._used_bytes + nbytes <= self._max_bytes:
+                self._admit(nbytes)
+                return
+            self._waiters += 1
+            self._publish_gauges()
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self._used_bytes + nbytes <= self._max_bytes),
+                    timeout=self._wait_seconds,
+                )
+            except asyncio.TimeoutError:
+                if self._metrics:
+                    self._metrics.increment_counter("image_processor.decode_budget.rejected")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Image processor memory budget is exhausted, retry later",
+                    headers={"Retry-After": str(self._retry_after)},
+                ) from None
+            finally:
+                self._waiters -= 1
+            self._admit(nbytes)
+
+    async def _release(self, nbytes: int) -> None:
+        async with self._condition:
+            self._used_bytes = max(0, self._used_bytes - nbytes)
+            self._publish_gauges()
+            self._condition.notify_all()
+
+    def _admit(self, nbytes: int) -> None:
+        self._used_bytes += nbytes
+        self._publish_gauges()
+
+    def _publish_gauges(self) -> None:
+        if not self._metrics:
+            return
+        self._metrics.set_gauge("image_processor.decode_budget.used_bytes", self._used_bytes)
+        self._metrics.set_gauge("image_processor.decode_budget.waiters", self._waiters)
+        self._metrics.set_gauge(
+            "image_processor.decode_budget.utilisation", round(self._used_bytes / self._max_bytes, 3)
+        )
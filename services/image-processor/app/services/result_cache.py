@@ -0,0 +1,221 @@
+"""Content-addressed cache for processed images."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.models import AppliedOptions
+from app.services.image_service import ProcessedImage
+
+# Inputs above this size are hashed off the event loop (hashlib releases the GIL).
+_THREADED_HASH_THRESHOLD = 1024 * 1024
+_HEADER = struct.Struct(">I")
+
+
+def _entry_size(result: ProcessedImage) -> int:
+    return len(result.data)
+
+
+class ResultCache:
+    """Two-tier LRU cache keyed by input bytes plus canonical options.
+
+    The memory tier is bounded by entry count and bytes. The optional disk
+    tier stores one file per key under ``directory`` and evicts the least
+    recently used files once ``disk_max_bytes`` is exceeded.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        directory: Optional[str] = None,
+        disk_max_bytes: int = 0,
+        logger: Optional[logging.Logger] = None,
+        metrics_recorder=None,
+    ) -> None:
+        self._max_entries = max(1, max_entries)
+        self._max_bytes = max(0, max_bytes)
+        self._memory: "OrderedDict[str, ProcessedImage]" = OrderedDict()
+        self._memory_bytes = 0
+        self._logger = logger or logging.getLogger("tzona.image_processor.cache")
+        self._metrics = metrics_recorder
+        self._directory = Path(directory) if directory else None
+        self._disk_max_bytes = max(0, disk_max_bytes)
+        self._disk_index: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        if self._directory is not None and self._disk_max_bytes > 0:
+            self._load_disk_index()
+        else:
+            self._directory = None
+        self._publish_gauges()
+
+    async def key_for(self, raw_bytes: bytes, options: Dict[str, Any]) -> str:
+        """Hash the input bytes together with canonical processing options."""
+        canonical = json.dumps(options, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if len(raw_bytes) >= _THREADED_HASH_THRESHOLD:
+            digest = await asyncio.to_thread(self._digest, raw_bytes, canonical)
+        else:
+            digest = self._digest(raw_bytes, canonical)
+        return digest
+
+    async def get(self, key: str) -> Optional[ProcessedImage]:
+        """Return a cached result, promoting disk hits into memory."""
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self._record_hit("memory", result)
+            return result
+        if self._directory is not None and key in self._disk_index:
+            result = await asyncio.to_thread(self._read_disk, key)
+            if result is not None:
+                self._disk_index.move_to_end(key)
+                self._store_memory(key, result)
+                self._record_hit("disk", result)
+                return result
+            self._drop_disk_entry(key)
+        if self._metrics:
+            self._metrics.increment_counter("image_processor.cache.miss")
+        return None
+
+    async def put(self, key: str, result: ProcessedImage) -> None:
+        """Store a freshly rendered result in every enabled tier."""
+        self._store_memory(key, result)
+        if self._directory is not None and key not in self._disk_index:
+            if _entry_size(result) <= self._disk_max_bytes:
+                try:
+                    written = await asyncio.to_thread(self._write_disk, key, result)
+                except OSError as exc:
+                    self._logger.warning("image cache write failed", extra={"error": str(exc)})
+                else:
+                    self._disk_index[key] = written
+                    self._disk_bytes += written
+                    self._evict_disk()
+        self._publish_gauges()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memoryEntries": len(self._memory),
+            "memoryBytes": self._memory_bytes,
+            "diskEnabled": self._directory is not None,
+            "diskEntries": len(self._disk_index),
+            "diskBytes": self._disk_bytes,
+        }
+
+    @staticmethod
+    def _digest(raw_bytes: bytes, canonical: bytes) -> str:
+        hasher = hashlib.sha256(raw_bytes)
+        hasher.update(b"\0")
+        hasher.update(canonical)
+        return hasher.hexdigest()
+
+    def _record_hit(self, tier: str, result: ProcessedImage) -> None:
+        if self._metrics:
+            self._metrics.increment_counter("image_processor.cache.hit")
+            self._metrics.increment_counter(f"image_processor.cache.hit.{tier}")
+            self._metrics.increment_counter("image_processor.cache.bytes_saved", _entry_size(result))
+
+    def _store_memory(self, key: str, result: ProcessedImage) -> None:
+        size = _entry_size(result)
+        if size > self._max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= _entry_size(previous)
+        self._memory[key] = result
+        self._memory_bytes += size
+        while len(self._memory) > self._max_entries or self._memory_bytes > self._max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= _entry_size(evicted)
+        self._publish_gauges()
+
+    def _path_for(self, key: str) -> Path:
+        assert self._directory is not None
+        return self._directory / key[:2] / f"{key}.bin"
+
+    def _load_disk_index(self) -> None:
+        assert self._directory is not None
+        self._directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self._directory.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _write_disk(self, key: str, result: ProcessedImage) -> int:
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = json.dumps(
+            {
+                "width": result.width,
+                "height": result.height,
+                "format": result.format,
+                "sourceFormat": result.source_format,
+                "frames": result.frames,
+                "applied": result.applied.model_dump(),
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, "wb") as handle:
+            handle.write(_HEADER.pack(len(header)))
+            handle.write(header)
+            handle.write(result.data)
+        os.replace(tmp_path, path)
+        return _HEADER.size + len(header) + len(result.data)
+
+    def _read_disk(self, key: str) -> Optional[ProcessedImage]:
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as handle:
+                (header_size,) = _HEADER.unpack(handle.read(_HEADER.size))
+                header = json.loads(handle.read(header_size))
+                data = handle.read()
+            os.utime(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        return ProcessedImage(
+            data=data,
+            width=header["width"],
+            height=header["height"],
+            format=header["format"],
+            source_format=header["sourceFormat"],
+            frames=header.get("frames", 1),
+            applied=AppliedOptions(**header["applied"]),
+        )
+
+    def _drop_disk_entry(self, key: str) -> None:
+        size = self._disk_index.pop(key, None)
+        if size is None:
+            return
+        self._disk_bytes -= size
+        try:
+            self._path_for(key).unlink()
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        while self._disk_bytes > self._disk_max_bytes and self._disk_index:
+            key = next(iter(self._disk_index))
+            self._drop_disk_entry(key)
+
+    def _publish_gauges(self) -> None:
+        if not self._metrics:
+            return
+        self._metrics.set_gauge("image_processor.cache.memory_entries", len(self._memory))
+        self._metrics.set_gauge("image_processor.cache.memory_bytes", self._memory_bytes)
+        self._metrics.set_gauge("image_processor.cache.disk_bytes", self._disk_bytes)
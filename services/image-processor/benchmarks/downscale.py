@@ -0,0 +1,108 @@
+"""Benchmark the large-downscale fast path across resampling policies.
+
+Renders a synthetic 12MP (4000x3000) photo-like input down to common target
+boxes under each ``IMAGE_PROCESSOR_RESAMPLE_POLICY`` and reports median
+latency and the peak RSS growth while rendering. Every policy/format pair
+runs in a fresh interpreter so peak RSS is not polluted by earlier runs.
+
+Usage:
+    python benchmarks/downscale.py [--iterations 5] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import synthetic_source
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+POLICIES = ("quality", "balanced", "speed")
+SOURCE_SIZE = (4000, 3000)
+SOURCE_FORMATS = ("JPEG", "PNG", "WEBP")
+TARGETS = ((320, 320, "cover"), (640, 640, "contain"), (1280, 1280, "contain"), (800, 600, "fill"))
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_case(source_path: str, iterations: int) -> dict:
+    """Child process: render one source format under the policy set in the environment."""
+    sys.path.insert(0, str(SERVICE_DIR))
+    import logging
+
+    from app.models import ResizeOptions
+    from app.services.image_service import ImageProcessor
+
+    processor = ImageProcessor(logging.getLogger("benchmark"), None)
+    raw = Path(source_path).read_bytes()
+    baseline_rss = _peak_rss_mb()
+    latency = {}
+    for width, height, mode in TARGETS:
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            processor.render(
+                raw,
+                ResizeOptions(maxWidth=width, maxHeight=height, mode=mode),
+                quality=None,
+                output_format="webp",
+                adjustments=None,
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+        latency[f"{width}x{height} {mode}"] = round(statistics.median(timings), 2)
+    return {"latencyMs": latency, "peakRssDeltaMb": round(_peak_rss_mb() - baseline_rss, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_case(args.child, args.iterations)))
+        return
+
+    report: dict = {policy: {} for policy in POLICIES}
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in SOURCE_FORMATS:
+            source_path = Path(workdir) / f"source.{fmt.lower()}"
+            source_path.write_bytes(synthetic_source(fmt, SOURCE_SIZE))
+            for policy in POLICIES:
+                env = {**os.environ, "IMAGE_PROCESSOR_RESAMPLE_POLICY": policy}
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", str(source_path), "--iterations", str(args.iterations)],
+                    env=env,
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                ).stdout
+                report[policy][fmt] = json.loads(output.strip().splitlines()[-1])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'case':<30}" + "".join(f"{policy:>12}" for policy in POLICIES))
+    for fmt in SOURCE_FORMATS:
+        for case in report[POLICIES[0]][fmt]["latencyMs"]:
+            row = "".join(f"{report[p][fmt]['latencyMs'][case]:>10.1f}ms" for p in POLICIES)
+            print(f"{fmt + ' -> ' + case:<30}{row}")
+        row = "".join(f"{report[p][fmt]['peakRssDeltaMb']:>10.1f}MB" for p in POLICIES)
+        print(f"{fmt + ' peak RSS delta':<30}{row}")
+
+
+if __name__ == "__main__":
+    main()
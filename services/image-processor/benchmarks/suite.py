@@ -0,0 +1,260 @@
+"""Throughput and regression suite for the image processing pipeline.
+
+Runs ``ImageProcessor.render`` over a corpus made of the repo's
+``картинки/`` WebP assets, synthetic JPEG/PNG inputs at several
+resolutions and a synthetic animated GIF, for every mode in ``allowed_modes`` (plus anchored cover and
+pad layouts) and every format in ``allowed_formats``. Each corpus input is
+measured in a fresh interpreter so its peak RSS is isolated. Reports p50/p95
+latency, images/sec per core (single-threaded), bytes in/out and peak RSS
+growth.
+
+``--write-baseline`` stores the JSON report; ``--baseline`` compares against
+a stored report and exits with status 1 when any case's p50 latency or output
+size regresses by more than ``--tolerance``.
+
+Usage:
+    python benchmarks/suite.py [--iterations 5] [--assets 4] [--json]
+    python benchmarks/suite.py --write-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import synthetic_source
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+ASSET_DIR = SERVICE_DIR.parents[1] / "картинки"
+SYNTHETIC_SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+SYNTHETIC_FORMATS = ("JPEG", "PNG")
+# Animated GIF input: WebP output takes the frame-streamed path.
+ANIMATED_SIZE, ANIMATED_FRAMES = (480, 360), 24
+TARGET_BOX = (640, 640)
+# Extra anchored layouts on top of the centred run of every mode.
+ANCHORED_LAYOUTS = (("cover", "top-left"), ("cover", "bottom-right"), ("pad", "top"), ("pad", "bottom-right"))
+
+
+def _synthetic_animation(size: tuple[int, int], frames: int) -> bytes:
+    """A gradient background with a block sweeping across it."""
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    background = Image.linear_gradient("L").resize(size).convert("RGB")
+    sequence = []
+    for index in range(frames):
+        frame = background.copy()
+        left = index * (width - height // 3) // max(1, frames - 1)
+        ImageDraw.Draw(frame).rectangle((left, height // 3, left + height // 3, 2 * height // 3), fill=(220, 60, 40))
+        sequence.append(frame)
+    buffer = io.BytesIO()
+    sequence[0].save(buffer, format="GIF", save_all=True, append_images=sequence[1:], duration=40, loop=0)
+    return buffer.getvalue()
+
+
+def _asset_sample(count: int) -> list[Path]:
+    """Evenly spaced, deterministic sample of the WebP assets."""
+    assets = sorted(ASSET_DIR.rglob("*.webp"))
+    if count <= 0 or not assets:
+        return []
+    step = max(1, len(assets) // count)
+    return assets[::step][:count]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _run_input(source_path: str, iterations: int, warmup: int) -> dict:
+    """Child process: render one corpus input in every mode and format."""
+    sys.path.insert(0, str(SERVICE_DIR))
+    import logging
+
+    from app.config import config
+    from app.models import ResizeOptions
+    from app.services.image_service import ImageProcessor
+
+    processor = ImageProcessor(logging.getLogger("benchmark"), None)
+    raw = Path(source_path).read_bytes()
+    baseline_rss = _peak_rss_mb()
+    cases = {}
+    layouts = [(mode, None) for mode in config.allowed_modes]
+    layouts += [(mode, position) for mode, position in ANCHORED_LAYOUTS if mode in config.allowed_modes]
+    for mode, position in layouts:
+        resize = ResizeOptions(
+            maxWidth=TARGET_BOX[0], maxHeight=TARGET_BOX[1], mode=mode, position=position, background="#FFFFFF"
+        )
+        layout = f"{mode}@{position}" if position else mode
+        for fmt in config.allowed_formats:
+            timings = []
+            bytes_out = 0
+            for iteration in range(warmup + iterations):
+                started = time.perf_counter()
+                result = processor.render(raw, resize, quality=None, output_format=fmt, adjustments=None)
+                elapsed = (time.perf_counter() - started) * 1000
+                if iteration >= warmup:
+                    timings.append(elapsed)
+                bytes_out = len(result.data)
+            cases[f"{layout}|{fmt.lower()}"] = {
+                "p50Ms": round(statistics.median(timings), 2),
+                "p95Ms": round(_percentile(timings, 0.95), 2),
+                "imagesPerSecPerCore": round(1000 / statistics.mean(timings), 2),
+                "bytesIn": len(raw),
+                "bytesOut": bytes_out,
+            }
+    return {
+        "cases": cases,
+        "peakRssDeltaMb": round(_peak_rss_mb() - baseline_rss, 1),
+        "encoderProfile": config.encoder_profile,
+        "resamplePolicy": config.resample_policy,
+    }
+
+
+def _build_corpus(workdir: Path, asset_count: int) -> dict[str, Path]:
+    corpus: dict[str, Path] = {}
+    for index, path in enumerate(_asset_sample(asset_count)):
+        corpus[f"asset{index}-{path.stem}.webp"] = path
+    for fmt in SYNTHETIC_FORMATS:
+        for width, height in SYNTHETIC_SIZES:
+            name = f"synthetic-{width}x{height}.{fmt.lower()}"
+            path = workdir / name
+            path.write_bytes(synthetic_source(fmt, (width, height)))
+            corpus[name] = path
+    name = f"synthetic-anim-{ANIMATED_SIZE[0]}x{ANIMATED_SIZE[1]}.gif"
+    path = workdir / name
+    path.write_bytes(_synthetic_animation(ANIMATED_SIZE, ANIMATED_FRAMES))
+    corpus[name] = path
+    return corpus
+
+
+def _summarise(inputs: dict) -> dict:
+    """Aggregate per-case results by layout (mode plus anchor) and by output format."""
+    groups: dict[str, dict[str, list[dict]]] = {"byMode": {}, "byFormat": {}}
+    for result in inputs.values():
+        for case, stats in result["cases"].items():
+            layout, fmt = case.split("|")
+            groups["byMode"].setdefault(layout, []).append(stats)
+            groups["byFormat"].setdefault(fmt, []).append(stats)
+    summary: dict = {}
+    for group, buckets in groups.items():
+        summary[group] = {
+            key: {
+                "p50Ms": round(statistics.median(s["p50Ms"] for s in stats), 2),
+                "p95Ms": round(max(s["p95Ms"] for s in stats), 2),
+                "imagesPerSecPerCore": round(statistics.mean(s["imagesPerSecPerCore"] for s in stats), 2),
+                "bytesIn": sum(s["bytesIn"] for s in stats),
+                "bytesOut": sum(s["bytesOut"] for s in stats),
+            }
+            for key, stats in sorted(buckets.items())
+        }
+    summary["peakRssDeltaMb"] = max((r["peakRssDeltaMb"] for r in inputs.values()), default=0.0)
+    return summary
+
+
+def _compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a line per case whose p50 latency or output size regressed beyond tolerance."""
+    regressions = []
+    for name, result in report["inputs"].items():
+        baseline_cases = baseline.get("inputs", {}).get(name, {}).get("cases", {})
+        for case, stats in result["cases"].items():
+            previous = baseline_cases.get(case)
+            if previous is None:
+                continue
+            for metric in ("p50Ms", "bytesOut"):
+                if previous[metric] and stats[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} {case} {metric}: {previous[metric]} -> {stats[metric]}"
+                        f" (+{(stats[metric] / previous[metric] - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--assets", type=int, default=4, help="number of картинки/ WebP assets to include")
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    parser.add_argument("--baseline", help="fail when results regress against this report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--write-baseline", help="write the report to this path")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_run_input(args.child, args.iterations, args.warmup)))
+        return
+
+    inputs: dict = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, path in _build_corpus(Path(workdir), args.assets).items():
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    str(path),
+                    "--iterations",
+                    str(args.iterations),
+                    "--warmup",
+                    str(args.warmup),
+                ],
+                env=os.environ,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            inputs[name] = json.loads(output.strip().splitlines()[-1])
+
+    report = {
+        "targetBox": list(TARGET_BOX),
+        "iterations": args.iterations,
+        "inputs": inputs,
+        "summary": _summarise(inputs),
+    }
+    if args.write_baseline:
+        Path(args.write_baseline).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+    regressions: list[str] = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = _compare(report, baseline, args.tolerance)
+        report["regressions"] = regressions
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'group':<20}{'p50':>10}{'p95':>10}{'img/s/core':>12}{'bytes in':>14}{'bytes out':>14}")
+        for group in ("byMode", "byFormat"):
+            for key, stats in report["summary"][group].items():
+                print(
+                    f"{key:<20}{stats['p50Ms']:>8.1f}ms{stats['p95Ms']:>8.1f}ms"
+                    f"{stats['imagesPerSecPerCore']:>12.1f}{stats['bytesIn']:>14}{stats['bytesOut']:>14}"
+                )
+        print(f"peak RSS delta: {report['summary']['peakRssDeltaMb']:.1f}MB")
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
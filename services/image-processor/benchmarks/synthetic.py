@@ -0,0 +1,18 @@
+"""Synthetic inputs shared by the benchmark scripts in this directory."""
+
+from __future__ import annotations
+
+import io
+
+
+def synthetic_source(fmt: str, size: tuple[int, int]) -> bytes:
+    """Smooth gradients plus mild noise, closer to a photo than flat colour or pure noise."""
+    from PIL import Image, ImageFilter
+
+    width, height = size
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 24).filter(ImageFilter.GaussianBlur(1.5))
+    image = Image.merge("RGB", (base, noise, base.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=90)
+    return buffer.getvalue()
@@ -8,4 +8,5 @@ __all__ = [
     "logging",
     "metrics",
     "rate_limit",
+    "redis_cache",
 ]
@@ -0,0 +1,155 @@
+"""Per-request overhead and SSE time-to-first-byte of the shared middleware stack.
+
+Builds one FastAPI app without middleware and one with the stack the services
+install (``TraceMiddleware``, CORS, ``RateLimitMiddleware`` and
+``MetricsMiddleware``) and drives both in-process through the raw ASGI
+interface, so no HTTP client or socket overhead is measured. Reports the mean
+and p99 latency of a small JSON endpoint and the time to the first body chunk
+of an SSE endpoint whose first event is ready immediately.
+
+Usage:
+    python services/python_shared/benchmarks/middleware_stack.py [--requests 5000] [--streams 500] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+
+from python_shared.metrics import MetricsMiddleware, MetricsRecorder  # noqa: E402
+from python_shared.rate_limit import RateLimitConfig, RateLimitMiddleware, RateLimiter  # noqa: E402
+from python_shared.tracing import TraceMiddleware  # noqa: E402
+
+
+def _build_app(with_middleware: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping() -> dict:
+        return {"status": "ok"}
+
+    @app.get("/api/stream")
+    async def stream() -> StreamingResponse:
+        async def events():
+            yield "data: first\n\n"
+            for index in range(3):
+                await asyncio.sleep(0.001)
+                yield f"data: {index}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if with_middleware:
+        config = RateLimitConfig(limit=10**9)
+        app.add_middleware(TraceMiddleware)
+        app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+        app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(config), config=config)
+        app.add_middleware(MetricsMiddleware, recorder=MetricsRecorder("bench"))
+    return app
+
+
+async def _call(app: FastAPI, path: str) -> tuple[int, int]:
+    """Return (time to first body byte, time to completion) in nanoseconds."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"origin", b"http://bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    disconnected = asyncio.get_running_loop().create_future()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return await disconnected
+
+    first_byte = 0
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and message.get("body") and not first_byte:
+            first_byte = time.perf_counter_ns()
+
+    started = time.perf_counter_ns()
+    await app(scope, receive, send)
+    finished = time.perf_counter_ns()
+    disconnected.cancel()
+    return first_byte - started, finished - started
+
+
+def _summary(samples: list[int]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "meanUs": round(statistics.fmean(ordered) / 1000, 1),
+        "p50Us": round(ordered[len(ordered) // 2] / 1000, 1),
+        "p99Us": round(ordered[int(len(ordered) * 0.99)] / 1000, 1),
+    }
+
+
+async def _measure(with_middleware: bool, requests: int, streams: int) -> dict:
+    app = _build_app(with_middleware)
+    for _ in range(200):
+        await _call(app, "/api/ping")
+    ping = [(await _call(app, "/api/ping"))[1] for _ in range(requests)]
+    ttfb = [(await _call(app, "/api/stream"))[0] for _ in range(streams)]
+    return {"ping": _summary(ping), "sseFirstByte": _summary(ttfb)}
+
+
+async def _run(requests: int, streams: int) -> dict:
+    bare = await _measure(False, requests, streams)
+    stack = await _measure(True, requests, streams)
+    return {
+        "bare": bare,
+        "stack": stack,
+        "overheadUs": {
+            "ping": round(stack["ping"]["meanUs"] - bare["ping"]["meanUs"], 1),
+            "sseFirstByte": round(stack["sseFirstByte"]["meanUs"] - bare["sseFirstByte"]["meanUs"], 1),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--streams", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args()
+
+    report = asyncio.run(_run(args.requests, args.streams))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'':>22}{'meanUs':>10}{'p50Us':>10}{'p99Us':>10}")
+    for app_name in ("bare", "stack"):
+        for endpoint in ("ping", "sseFirstByte"):
+            stats = report[app_name][endpoint]
+            label = f"{app_name} {endpoint}"
+            print(f"{label:>22}{stats['meanUs']:>10}{stats['p50Us']:>10}{stats['p99Us']:>10}")
+    overhead = report["overheadUs"]
+    print(f"overhead: ping {overhead['ping']}us, SSE first byte {overhead['sseFirstByte']}us")
+
+
+if __name__ == "__main__":
+    main()
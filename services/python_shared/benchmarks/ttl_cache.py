@@ -0,0 +1,85 @@
+"""Micro-benchmark for ``python_shared.cache.AsyncTTLCache``.
+
+Fills a cache to ``max_entries`` for each size and measures the mean cost of
+a hit, a miss, an overwrite and an insert that forces an eviction, plus a
+mixed-TTL insert run where expired entries are reclaimed. Latency per
+operation should stay flat as the cache grows from 512 to 100k entries.
+
+Usage:
+    python services/python_shared/benchmarks/ttl_cache.py [--sizes 512,4096,32768,100000] [--ops 50000] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from python_shared.cache import AsyncTTLCache, CacheConfig  # noqa: E402
+
+
+async def _per_op_ns(operation, keys: list[str]) -> float:
+    started = time.perf_counter_ns()
+    for key in keys:
+        await operation(key)
+    return (time.perf_counter_ns() - started) / len(keys)
+
+
+async def _measure(size: int, ops: int) -> dict:
+    cache = AsyncTTLCache(CacheConfig(namespace="bench", default_ttl_seconds=300, max_entries=size))
+    for index in range(size):
+        await cache.set(f"key:{index}", index)
+
+    rng = random.Random(size)
+    present = [f"key:{rng.randrange(size)}" for _ in range(ops)]
+    absent = [f"missing:{index}" for index in range(ops)]
+    fresh = [f"fresh:{index}" for index in range(ops)]
+
+    results = {
+        "getHitNs": await _per_op_ns(cache.get, present),
+        "getMissNs": await _per_op_ns(cache.get, absent),
+        "overwriteNs": await _per_op_ns(lambda key: cache.set(key, 1), present),
+        "evictingSetNs": await _per_op_ns(lambda key: cache.set(key, 1), fresh),
+    }
+
+    # Short-lived entries mixed with long-lived ones exercise the expiry heap.
+    short = [f"short:{index}" for index in range(ops)]
+    for key in short[: size // 2]:
+        await cache.set(key, 1, ttl_seconds=0.1)
+    await asyncio.sleep(0.15)
+    results["expiringSetNs"] = await _per_op_ns(lambda key: cache.set(key, 1), short[size // 2 :] or short)
+    results["entries"] = len(cache)
+    return {key: round(value, 1) if isinstance(value, float) else value for key, value in results.items()}
+
+
+async def _run(sizes: list[int], ops: int) -> dict:
+    return {str(size): await _measure(size, ops) for size in sizes}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="512,4096,32768,100000")
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--json", action="store_true", help="print machine-readable output")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = asyncio.run(_run(sizes, args.ops))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    columns = ("getHitNs", "getMissNs", "overwriteNs", "evictingSetNs", "expiringSetNs")
+    print(f"{'entries':>10}" + "".join(f"{column:>16}" for column in columns))
+    for size, stats in report.items():
+        print(f"{size:>10}" + "".join(f"{stats[column]:>16.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,101 +1,662 @@
-"""Reusable async TTL cache for TZONA microservices."""
+"""Reusable async TTL cache for TZONA Python microservices."""
 
 from __future__ import annotations
 
 import asyncio
+import heapq
+import json
+import logging
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 
 @dataclass(frozen=True)
 class CacheConfig:
-    """Configuration for the in-memory TTL cache."""
+    """Configuration for the in-memory TTL cache.
+
+    Entries are fresh for their TTL (the soft TTL). For a further
+    ``stale_ttl_seconds`` (up to the hard TTL) ``remember`` keeps serving the
+    stale value while one background refresh replaces it. Keys read at least
+    ``refresh_ahead_hits`` times within their TTL are refreshed in the
+    background once less than ``refresh_ahead_fraction`` of the TTL is left.
+    Zero disables either behaviour.
+
+    ``max_bytes`` caps the summed weight of the entries on top of
+    ``max_entries``; ``weigher`` returns a value's weight in bytes and
+    defaults to the length of its compact JSON encoding. Zero disables the
+    byte cap and the weighing.
+
+    Hit ratios and loader latency are reported per key prefix: the first
+    ``key_prefix_segments`` ``:``-separated segments of a key, never
+    including its last one (``stats:profile:<id>`` -> ``stats:profile``).
+    ``hot_keys`` is the number of most-read keys tracked; zero disables it.
+    """
 
     namespace: str = "cache"
     default_ttl_seconds: float = 60.0
     max_entries: int = 512
+    stale_ttl_seconds: float = 0.0
+    refresh_ahead_hits: int = 0
+    refresh_ahead_fraction: float = 0.2
+    max_bytes: int = 0
+    weigher: Optional[Callable[[Any], int]] = None
+    key_prefix_segments: int = 2
+    hot_keys: int = 16
+
+
+def json_weight(value: Any) -> int:
+    """Approximate a value's size as the length of its compact JSON encoding."""
+    return len(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"))
+
+
+@dataclass(slots=True)
+class _PrefixStats:
+    """Lookup outcomes and loader timings for one key prefix."""
 
+    hits: int = 0
+    stale_hits: int = 0
+    l2_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    expirations: int = 0
+    loads: int = 0
+    load_ms: float = 0.0
 
-@dataclass
+    def merge(self, other: "_PrefixStats") -> None:
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        served = self.hits + self.stale_hits + self.l2_hits
+        lookups = served + self.misses + self.coalesced
+        avg_load_ms = self.load_ms / self.loads if self.loads else 0.0
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "expirations": self.expirations,
+            # Share of lookups answered without waiting for a loader.
+            "hit_ratio": served / lookups if lookups else 0.0,
+            "loads": self.loads,
+            "avg_load_ms": avg_load_ms,
+            "saved_ms": served * avg_load_ms,
+        }
+
+
+@dataclass(slots=True)
 class _CacheEntry:
     value: Any
+    stale_at: float
     expires_at: float
+    ttl: float
+    stats: _PrefixStats
+    weight: int = 0
+    hits: int = 0
+
+
+class _SpaceSaving:
+    """Space-saving sketch of the most frequent keys in ``capacity`` counters.
+
+    A key that is not tracked replaces the least counted one and inherits its
+    count, so counts overestimate by at most the reported ``error``; any key
+    read more than ``total / capacity`` times is guaranteed to be tracked.
+    Counts of tracked keys are bumped in place and their heap items corrected
+    lazily when they surface as the minimum.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def add(self, key: str) -> None:
+        counts = self._counts
+        if key in counts:
+            counts[key] += 1
+            return
+        if len(counts) < self._capacity:
+            counts[key] = 1
+            self._errors[key] = 0
+            heapq.heappush(self._heap, (1, key))
+            return
+        heap = self._heap
+        floor, victim = heap[0]
+        while counts[victim] != floor:
+            heapq.heapreplace(heap, (counts[victim], victim))
+            floor, victim = heap[0]
+        heapq.heapreplace(heap, (floor + 1, key))
+        del counts[victim], self._errors[victim]
+        counts[key] = floor + 1
+        self._errors[key] = floor
+
+    def top(self) -> List[Dict[str, Any]]:
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [{"key": key, "count": count, "error": self._errors[key]} for key, count in ranked]
+
+
+# Prefixes beyond this many are folded into ``_OTHER_PREFIX`` so stats stay bounded.
+_MAX_PREFIXES = 64
+_OTHER_PREFIX = "other"
+
+# L2 expiries are wall-clock and L1 ones monotonic; a refresh only takes an L2
+# copy that goes stale at least this much later than the entry it replaces.
+_L2_CLOCK_SLACK_SECONDS = 1.0
+
+
+@dataclass(slots=True)
+class _Flight:
+    """A loader call in progress and the number of callers waiting on it."""
+
+    future: "asyncio.Future[Any]"
+    waiters: int = 0
+
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+def _retrieve_exception(future: "asyncio.Future[Any]") -> None:
+    # Mark a failed flight's exception as retrieved even when nobody waited on it.
+    if not future.cancelled():
+        future.exception()
 
 
 class AsyncTTLCache:
-    """Small async-friendly TTL cache with stampede protection."""
+    """Small async-friendly TTL cache with stampede protection.
+
+    Entries live in an ``OrderedDict`` kept in least-recently-used order and
+    their hard expiry times in a min-heap, so expiring and evicting are
+    O(log n) and O(1) instead of full scans. ``get`` and ``set`` never await,
+    which makes them atomic on the event loop without a lock. Heap items for
+    overwritten or deleted keys are skipped lazily and compacted away once
+    they outnumber the live entries.
+
+    Concurrent ``remember`` misses for one key are coalesced into a single
+    loader call whose result or exception is shared by every caller. The
+    in-flight record is dropped as soon as the loader finishes, so nothing
+    accumulates per key. Background refreshes go through the same flights.
+
+    With an ``l2`` tier (see ``python_shared.redis_cache``) L1 misses are
+    looked up there before calling the loader, writes go to both tiers, and
+    ``delete``/``clear`` also invalidate the L1 of every peer. Call ``start``
+    and ``close`` from the service lifecycle to connect the tier.
 
-    def __init__(self, config: Optional[CacheConfig] = None) -> None:
+    ``stats`` reports hit ratios, loader latency and the time those hits
+    saved per key prefix, evictions and the hottest keys. With ``metrics`` it
+    is registered as the ``cache.<namespace>`` snapshot collector and loader
+    latency is also recorded in the ``cache.<namespace>.loader_ms`` histogram.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CacheConfig] = None,
+        *,
+        metrics=None,
+        logger: Optional[logging.Logger] = None,
+        l2=None,
+    ) -> None:
         self._config = config or CacheConfig()
-        self._entries: Dict[str, _CacheEntry] = {}
-        self._lock = asyncio.Lock()
-        self._key_locks: Dict[str, asyncio.Lock] = {}
+        self._metrics = metrics
+        self._l2 = l2
+        self._logger = logger or logging.getLogger(f"tzona.cache.{self._config.namespace}")
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._weigher = self._config.weigher or json_weight
+        self._flights: Dict[str, _Flight] = {}
+        self._waiters = 0
+        self._refreshes: Set["asyncio.Task[Any]"] = set()
+        self._prefixes: Dict[str, _PrefixStats] = {}
+        self._evictions: Dict[str, int] = {}
+        self._hot_keys = _SpaceSaving(self._config.hot_keys) if self._config.hot_keys > 0 else None
+        if self._metrics:
+            self._metrics.register_collector(f"cache.{self._config.namespace}", self.stats)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def start(self) -> None:
+        """Connect the L2 tier, if any, and subscribe to peer invalidations."""
+        if self._l2 is not None:
+            await self._l2.connect(self._invalidate_local)
+
+    async def close(self) -> None:
+        for task in list(self._refreshes):
+            task.cancel()
+        if self._l2 is not None:
+            await self._l2.close()
 
     async def get(self, key: str) -> Optional[Any]:
-        """Return a cached value if it's still valid."""
-
-        async with self._lock:
-            entry = self._entries.get(key)
-            if not entry:
-                return None
-            if entry.expires_at <= time.monotonic():
-                self._entries.pop(key, None)
-                return None
+        """Return a cached value if it's still fresh."""
+
+        self._track_hot_key(key)
+        entry = self._fresh_entry(key, time.monotonic())
+        if entry is not None:
             return entry.value
+        stats = self._prefix_stats(key)
+        cached = await self._get_l2(key)
+        if cached is None:
+            stats.misses += 1
+            return None
+        stats.l2_hits += 1
+        return cached[0]
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Any]:
+        """Return the fresh values among ``keys``; L1 misses share one L2 round trip."""
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        for key in keys:
+            self._track_hot_key(key)
+            entry = self._fresh_entry(key, now)
+            if entry is not None:
+                found[key] = entry.value
+            else:
+                missing.append(key)
+        if not missing:
+            return found
+        cached_values = await self._l2.get_many(missing) if self._l2 is not None else [None] * len(missing)
+        for key, cached in zip(missing, cached_values):
+            stats = self._prefix_stats(key)
+            accepted = self._accept_l2(key, cached)
+            if accepted is None:
+                stats.misses += 1
+                continue
+            stats.l2_hits += 1
+            found[key] = accepted[0]
+        return found
 
-    async def set(self, key: str, value: Any, *, ttl_seconds: Optional[float] = None) -> Any:
-        ttl = ttl_seconds if ttl_seconds is not None else self._config.default_ttl_seconds
-        expires_at = time.monotonic() + max(0.1, ttl)
-        async with self._lock:
-            self._entries[key] = _CacheEntry(value=value, expires_at=expires_at)
-            self._prune_locked()
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        ttl, stale_ttl = self._ttls(ttl_seconds, stale_ttl_seconds)
+        self._set_local(key, value, ttl, stale_ttl)
+        if self._l2 is not None:
+            await self._l2.set(key, value, ttl_seconds=ttl, stale_ttl_seconds=stale_ttl)
         return value
 
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        *,
+        ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Store every item with the same TTLs; L2 writes share one round trip."""
+        ttl, stale_ttl = self._ttls(ttl_seconds, stale_ttl_seconds)
+        for key, value in items.items():
+            self._set_local(key, value, ttl, stale_ttl)
+        if self._l2 is not None and items:
+            await self._l2.set_many(items, ttl_seconds=ttl, stale_ttl_seconds=stale_ttl)
+
     async def remember(
         self,
         key: str,
-        loader: Callable[[], Awaitable[Any]],
+        loader: Loader,
         *,
         ttl_seconds: Optional[float] = None,
+        stale_ttl_seconds: Optional[float] = None,
     ) -> Any:
-        cached = await self.get(key)
-        if cached is not None:
-            return cached
+        self._track_hot_key(key)
+        now = time.monotonic()
+        entry = self._live_entry(key, now)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if now < entry.stale_at:
+                entry.hits += 1
+                entry.stats.hits += 1
+                if self._due_for_refresh_ahead(entry, now):
+                    self._refresh(
+                        key, loader, ttl_seconds, stale_ttl_seconds, entry.stale_at, reason="refresh_ahead"
+                    )
+                return entry.value
+            entry.stats.stale_hits += 1
+            self._refresh(key, loader, ttl_seconds, stale_ttl_seconds, entry.stale_at, reason="stale")
+            return entry.value
 
-        lock = await self._lock_for_key(key)
-        async with lock:
-            cached = await self.get(key)
-            if cached is not None:
-                return cached
-            value = await loader()
-            await self.set(key, value, ttl_seconds=ttl_seconds)
-            return value
+        stats = self._prefix_stats(key)
+        flight = self._flights.get(key)
+        if flight is not None:
+            stats.coalesced += 1
+            return await self._join(key, flight, loader, ttl_seconds, stale_ttl_seconds)
+        return await self._load(
+            key, self._begin_flight(key), loader, ttl_seconds, stale_ttl_seconds, stats=stats
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative lookup, loader and eviction stats, overall and per key prefix."""
+        totals = _PrefixStats()
+        prefixes = {}
+        for prefix, stats in list(self._prefixes.items()):
+            totals.merge(stats)
+            prefixes[prefix] = stats.to_dict()
+        return {
+            **totals.to_dict(),
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self._config.max_entries,
+            "max_bytes": self._config.max_bytes,
+            "evictions": dict(self._evictions),
+            "prefixes": prefixes,
+            "hot_keys": self._hot_keys.top() if self._hot_keys is not None else [],
+        }
 
     async def delete(self, key: str) -> None:
-        async with self._lock:
-            self._entries.pop(key, None)
+        self._remove(key)
+        self._publish_size()
+        if self._l2 is not None:
+            await self._l2.delete(key)
 
     async def clear(self) -> None:
-        async with self._lock:
+        self._invalidate_local(None)
+        if self._l2 is not None:
+            await self._l2.clear()
+
+    def _invalidate_local(self, key: Optional[str]) -> None:
+        """Drop ``key`` (or everything, for ``None``) from L1 only."""
+        if key is None:
             self._entries.clear()
+            self._expiry.clear()
+            self._bytes = 0
+        else:
+            self._remove(key)
+        self._publish_size()
 
-    async def _lock_for_key(self, key: str) -> asyncio.Lock:
-        async with self._lock:
-            lock = self._key_locks.get(key)
-            if lock is None:
-                lock = asyncio.Lock()
-                self._key_locks[key] = lock
-            return lock
+    def _track_hot_key(self, key: str) -> None:
+        if self._hot_keys is not None:
+            self._hot_keys.add(key)
 
-    def _prune_locked(self) -> None:
-        if len(self._entries) <= self._config.max_entries:
+    def _prefix(self, key: str) -> str:
+        depth = self._config.key_prefix_segments
+        segments = key.split(":", depth)
+        prefix = ":".join(segments[: min(depth, len(segments) - 1)]) or key
+        if prefix not in self._prefixes and len(self._prefixes) >= _MAX_PREFIXES:
+            return _OTHER_PREFIX
+        return prefix
+
+    def _prefix_stats(self, key: str) -> _PrefixStats:
+        prefix = self._prefix(key)
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            stats = self._prefixes[prefix] = _PrefixStats()
+        return stats
+
+    def _set_local(
+        self, key: str, value: Any, ttl: float, stale_ttl: float, *, fresh_seconds: Optional[float] = None
+    ) -> None:
+        """Store ``value`` in L1; ``fresh_seconds`` shortens its soft lifetime below ``ttl``."""
+        weight = self._weigher(value) if self._config.max_bytes > 0 else 0
+        self._remove(key)
+        if weight > self._config.max_bytes > 0:
+            # Caching it would evict everything else and still not fit.
+            self._count_eviction("oversize")
+            self._publish_size()
             return
-        now = time.monotonic()
-        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
-        for key in expired:
-            self._entries.pop(key, None)
-        while len(self._entries) > self._config.max_entries:
-            oldest_key = min(self._entries.items(), key=lambda item: item[1].expires_at)[0]
-            self._entries.pop(oldest_key, None)
+        stale_at = time.monotonic() + (ttl if fresh_seconds is None else fresh_seconds)
+        expires_at = stale_at + stale_ttl
+        self._entries[key] = _CacheEntry(
+            value=value,
+            stale_at=stale_at,
+            expires_at=expires_at,
+            ttl=ttl,
+            stats=self._prefix_stats(key),
+            weight=weight,
+        )
+        self._bytes += weight
+        heapq.heappush(self._expiry, (expires_at, key))
+        self._prune()
+        self._publish_size()
+
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.weight
+        if reason is not None:
+            self._count_eviction(reason)
+            if reason == "expired":
+                entry.stats.expirations += 1
+
+    async def _get_l2(self, key: str, *, stale_after: Optional[float] = None) -> Optional[Tuple[Any]]:
+        """Look ``key`` up in L2 and copy a fresh value into L1 for its remaining lifetime.
+
+        With ``stale_after`` (a local ``stale_at``) only a value that goes stale
+        later is taken, so a refresh is not answered by the copy it is replacing.
+        """
+        if self._l2 is None:
+            return None
+        return self._accept_l2(key, await self._l2.get(key), stale_after=stale_after)
+
+    def _accept_l2(
+        self, key: str, cached: Optional[Tuple[Any, float, float]], *, stale_after: Optional[float] = None
+    ) -> Optional[Tuple[Any]]:
+        if cached is None:
+            return None
+        value, fresh_seconds, ttl = cached
+        if fresh_seconds <= 0:
+            return None
+        if stale_after is not None and time.monotonic() + fresh_seconds <= stale_after + _L2_CLOCK_SLACK_SECONDS:
+            return None
+        self._set_local(key, value, ttl, self._config.stale_ttl_seconds, fresh_seconds=fresh_seconds)
+        return (value,)
+
+    def _ttls(self, ttl_seconds: Optional[float], stale_ttl_seconds: Optional[float]) -> Tuple[float, float]:
+        ttl = max(0.1, ttl_seconds if ttl_seconds is not None else self._config.default_ttl_seconds)
+        stale_ttl = max(
+            0.0, stale_ttl_seconds if stale_ttl_seconds is not None else self._config.stale_ttl_seconds
+        )
+        return ttl, stale_ttl
+
+    def _fresh_entry(self, key: str, now: float) -> Optional[_CacheEntry]:
+        """Return the entry and count a hit if it is within its soft TTL."""
+        entry = self._live_entry(key, now)
+        if entry is None or now >= entry.stale_at:
+            return None
+        entry.hits += 1
+        entry.stats.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def _live_entry(self, key: str, now: float) -> Optional[_CacheEntry]:
+        """Return the entry unless it is missing or past its hard expiry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            self._remove(key, "expired")
+            self._publish_size()
+            return None
+        return entry
+
+    def _due_for_refresh_ahead(self, entry: _CacheEntry, now: float) -> bool:
+        threshold = self._config.refresh_ahead_hits
+        return (
+            threshold > 0
+            and entry.hits >= threshold
+            and entry.stale_at - now < entry.ttl * self._config.refresh_ahead_fraction
+        )
+
+    def _refresh(
+        self,
+        key: str,
+        loader: Loader,
+        ttl_seconds: Optional[float],
+        stale_ttl_seconds: Optional[float],
+        stale_at: float,
+        *,
+        reason: str,
+    ) -> None:
+        """Reload ``key`` in the background unless a load for it is already running.
+
+        ``stale_at`` is the current entry's soft expiry; an L2 copy that is no
+        newer does not count as a reload.
+        """
+        if key in self._flights:
+            return
+        if self._metrics:
+            self._metrics.increment_counter(f"cache.{self._config.namespace}.{reason}")
+        # The flight is registered before the task first runs, so later callers see it.
+        flight = self._begin_flight(key)
+        task = asyncio.get_running_loop().create_task(
+            self._background_load(key, flight, loader, ttl_seconds, stale_ttl_seconds, stale_at)
+        )
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _background_load(
+        self,
+        key: str,
+        flight: _Flight,
+        loader: Loader,
+        ttl_seconds: Optional[float],
+        stale_ttl_seconds: Optional[float],
+        stale_at: float,
+    ) -> None:
+        try:
+            await self._load(key, flight, loader, ttl_seconds, stale_ttl_seconds, stale_after=stale_at)
+        except Exception:
+            # The stale value keeps being served until its hard expiry.
+            if self._metrics:
+                self._metrics.increment_counter(f"cache.{self._config.namespace}.refresh_failed")
+            self._logger.warning("cache.refresh_failed", extra={"key": key}, exc_info=True)
+
+    def _begin_flight(self, key: str) -> _Flight:
+        """Register a new in-flight load for ``key``."""
+        flight = _Flight(asyncio.get_running_loop().create_future())
+        flight.future.add_done_callback(_retrieve_exception)
+        self._flights[key] = flight
+        self._publish_flights()
+        return flight
+
+    async def _load(
+        self,
+        key: str,
+        flight: _Flight,
+        loader: Loader,
+        ttl_seconds: Optional[float],
+        stale_ttl_seconds: Optional[float],
+        *,
+        stats: Optional[_PrefixStats] = None,
+        stale_after: Optional[float] = None,
+    ) -> Any:
+        """Run ``loader`` as ``key``'s registered flight and store its result.
+
+        ``stats`` is the caller's prefix stats when the load answers a lookup;
+        background refreshes only record the loader timing and pass the soft
+        expiry of the entry they replace as ``stale_after``.
+        """
+        try:
+            cached = await self._get_l2(key, stale_after=stale_after)
+            if cached is not None:
+                if stats is not None:
+                    stats.l2_hits += 1
+                flight.future.set_result(cached[0])
+                return cached[0]
+            if stats is not None:
+                stats.misses += 1
+            started = time.perf_counter()
+            value = await loader()
+            self._observe_load(key, (time.perf_counter() - started) * 1000)
+            # Storing can fail too (a raising weigher, a cancelled L2 write); the
+            # handlers below must see that so waiters are never left hanging.
+            await self.set(key, value, ttl_seconds=ttl_seconds, stale_ttl_seconds=stale_ttl_seconds)
+        except asyncio.CancelledError:
+            # Waiters retry with a loader of their own instead of inheriting the cancellation.
+            flight.future.cancel()
+            raise
+        except BaseException as exc:
+            flight.future.set_exception(exc)
+            raise
+        else:
+            flight.future.set_result(value)
+            return value
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            self._publish_flights()
+
+    async def _join(
+        self,
+        key: str,
+        flight: _Flight,
+        loader: Loader,
+        ttl_seconds: Optional[float],
+        stale_ttl_seconds: Optional[float],
+    ) -> Any:
+        """Wait for another caller's loader; shielded so a waiter's cancellation leaves it running."""
+        flight.waiters += 1
+        self._waiters += 1
+        if self._metrics:
+            self._metrics.increment_counter(f"cache.{self._config.namespace}.coalesced")
+        self._publish_flights()
+        try:
+            return await asyncio.shield(flight.future)
+        except asyncio.CancelledError:
+            if not flight.future.cancelled():
+                raise
+        finally:
+            flight.waiters -= 1
+            self._waiters -= 1
+            self._publish_flights()
+        return await self.remember(key, loader, ttl_seconds=ttl_seconds, stale_ttl_seconds=stale_ttl_seconds)
+
+    def _observe_load(self, key: str, duration_ms: float) -> None:
+        prefix = self._prefix(key)
+        stats = self._prefix_stats(key)
+        stats.loads += 1
+        stats.load_ms += duration_ms
+        if self._metrics:
+            self._metrics.observe_histogram(
+                f"cache.{self._config.namespace}.loader_ms", duration_ms, labels={"prefix": prefix}
+            )
+
+    def _count_eviction(self, reason: str) -> None:
+        self._evictions[reason] = self._evictions.get(reason, 0) + 1
+        if self._metrics:
+            self._metrics.increment_counter(f"cache.{self._config.namespace}.evictions.{reason}")
+
+    def _publish_size(self) -> None:
+        if not self._metrics:
+            return
+        namespace = self._config.namespace
+        self._metrics.set_gauge(f"cache.{namespace}.entries", len(self._entries))
+        self._metrics.set_gauge(f"cache.{namespace}.bytes", self._bytes)
+
+    def _publish_flights(self) -> None:
+        if not self._metrics:
+            return
+        namespace = self._config.namespace
+        self._metrics.set_gauge(f"cache.{namespace}.inflight", len(self._flights))
+        self._metrics.set_gauge(f"cache.{namespace}.coalesced_waiters", self._waiters)
+
+    def _over_capacity(self) -> bool:
+        return len(self._entries) > self._config.max_entries or (
+            self._config.max_bytes > 0 and self._bytes > self._config.max_bytes
+        )
 
+    def _prune(self) -> None:
+        if self._over_capacity():
+            now = time.monotonic()
+            while self._expiry and self._expiry[0][0] <= now:
+                expires_at, key = heapq.heappop(self._expiry)
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at == expires_at:
+                    self._remove(key, "expired")
+            while len(self._entries) > self._config.max_entries:
+                self._remove(next(iter(self._entries)), "capacity")
+            while self._config.max_bytes > 0 and self._bytes > self._config.max_bytes:
+                self._remove(next(iter(self._entries)), "size")
+        if len(self._expiry) > 2 * len(self._entries) + 64:
+            self._expiry = [
+                (entry.expires_at, key) for key, entry in self._entries.items()
+            ]
+            heapq.heapify(self._expiry)
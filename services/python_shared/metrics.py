@@ -2,10 +2,168 @@
 
 from __future__ import annotations
 
+import math
+import re
 import time
-from dataclasses import asdict, dataclass, field
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import threading
 from threading import RLock
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from starlette.routing import Mount, compile_path
+
+# Upper bounds (ms) for duration histograms; a final +Inf bucket is implicit.
+DEFAULT_DURATION_BUCKETS_MS: Tuple[float, ...] = (
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+    10000.0,
+)
+
+
+# Latency sketches: bin i >= 1 covers [LATENCY_MIN_MS * gamma**(i-1), LATENCY_MIN_MS * gamma**i),
+# bin 0 everything below LATENCY_MIN_MS; percentiles are within ~2.4% of the true value.
+LATENCY_GAMMA = 1.05
+LATENCY_MIN_MS = 0.01
+_INV_LOG_GAMMA = 1 / math.log(LATENCY_GAMMA)
+_log = math.log
+LATENCY_PERCENTILES: Tuple[float, ...] = (0.5, 0.9, 0.95, 0.99)
+
+# Sliding windows reported next to the lifetime sketch, built from 10-second slots.
+LATENCY_WINDOWS_SECONDS: Dict[str, int] = {"1m": 60, "5m": 300, "15m": 900}
+_SLOT_SECONDS = 10
+_SLOT_COUNT = max(LATENCY_WINDOWS_SECONDS.values()) // _SLOT_SECONDS
+
+
+def _latency_bin(value_ms: float) -> int:
+    if value_ms < LATENCY_MIN_MS:
+        return 0
+    return int(_log(value_ms / LATENCY_MIN_MS) * _INV_LOG_GAMMA) + 1
+
+
+def _bin_value(index: int) -> float:
+    if index == 0:
+        return LATENCY_MIN_MS
+    # Midpoint that balances the relative error towards both bin edges.
+    return LATENCY_MIN_MS * LATENCY_GAMMA ** (index - 1) * 2 * LATENCY_GAMMA / (1 + LATENCY_GAMMA)
+
+
+@dataclass
+class LatencyHistogram:
+    """Log-bucketed latency sketch (DDSketch-style) with sparse bin counts.
+
+    Sketches merge by adding bin counts, so windows, endpoints or the
+    ``to_dict`` output of several replicas (see ``from_dict``) can be combined
+    before percentiles are read.
+    """
+
+    bins: Dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    total: float = 0.0
+
+    def register(self, value_ms: float) -> None:
+        self.add(_latency_bin(value_ms), value_ms)
+
+    def add(self, index: int, value_ms: float) -> None:
+        """Count ``value_ms`` in bin ``index`` (as computed by ``register``)."""
+        bins = self.bins
+        bins[index] = bins.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, bin_count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + bin_count
+        self.count += other.count
+        self.total += other.total
+
+    def copy(self) -> "LatencyHistogram":
+        return LatencyHistogram(dict(self.bins), self.count, self.total)
+
+    def reset(self) -> None:
+        self.bins.clear()
+        self.count = 0
+        self.total = 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        cumulative = 0
+        for index in sorted(self.bins):
+            cumulative += self.bins[index]
+            if cumulative > rank:
+                return _bin_value(index)
+        return _bin_value(max(self.bins))
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"count": self.count, "sum": self.total}
+        for q in LATENCY_PERCENTILES:
+            payload[f"p{q * 100:g}"] = self.quantile(q)
+        payload["bins"] = {str(index): self.bins[index] for index in sorted(self.bins)}
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "LatencyHistogram":
+        return cls(
+            bins={int(index): int(bin_count) for index, bin_count in payload.get("bins", {}).items()},
+            count=int(payload.get("count", 0)),
+            total=float(payload.get("sum", 0.0)),
+        )
+
+
+class LatencyStats:
+    """Lifetime latency sketch plus sketches over the last 1, 5 and 15 minutes.
+
+    Observations also go into a ring of 10-second slots aligned to wall-clock
+    time; a slot is reset in place when the ring wraps onto it, so recording
+    allocates nothing beyond new bins. A window merges its slots on read.
+    """
+
+    __slots__ = ("lifetime", "_slots", "_epochs")
+
+    def __init__(self) -> None:
+        self.lifetime = LatencyHistogram()
+        self._slots: List[Optional[LatencyHistogram]] = [None] * _SLOT_COUNT
+        self._epochs: List[int] = [-1] * _SLOT_COUNT
+
+    def register(self, value_ms: float, now: float) -> None:
+        index = _latency_bin(value_ms)
+        self.lifetime.add(index, value_ms)
+        epoch = int(now // _SLOT_SECONDS)
+        position = epoch % _SLOT_COUNT
+        slot = self._slots[position]
+        if slot is None:
+            slot = self._slots[position] = LatencyHistogram()
+        elif self._epochs[position] != epoch:
+            slot.reset()
+        self._epochs[position] = epoch
+        slot.add(index, value_ms)
+
+    def window(self, seconds: int, now: float) -> LatencyHistogram:
+        current = int(now // _SLOT_SECONDS)
+        oldest = current - seconds // _SLOT_SECONDS + 1
+        merged = LatencyHistogram()
+        for slot, epoch in zip(self._slots, self._epochs):
+            if slot is not None and oldest <= epoch <= current:
+                merged.merge(slot)
+        return merged
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        payload = {"lifetime": self.lifetime.to_dict()}
+        for name, seconds in LATENCY_WINDOWS_SECONDS.items():
+            payload[name] = self.window(seconds, now).to_dict()
+        return payload
 
 
 @dataclass
@@ -19,10 +177,18 @@ class RequestStats:
     server_error: int = 0
     last_error: Optional[str] = None
     max_duration_ms: float = 0.0
+    latency: LatencyStats = field(default_factory=LatencyStats)
 
-    def register(self, status_code: int, duration_ms: float, error: Optional[str]) -> None:
+    def register(
+        self,
+        status_code: int,
+        duration_ms: float,
+        error: Optional[str],
+        now: Optional[float] = None,
+    ) -> None:
         self.count += 1
         self.total_duration_ms += duration_ms
+        self.latency.register(duration_ms, time.time() if now is None else now)
         if status_code < 400:
             self.success += 1
         elif status_code < 500:
@@ -34,10 +200,18 @@ class RequestStats:
         if duration_ms > self.max_duration_ms:
             self.max_duration_ms = duration_ms
 
-    def to_dict(self) -> Dict[str, Any]:
-        payload = asdict(self)
-        payload["avg_duration_ms"] = self.total_duration_ms / self.count if self.count else 0.0
-        return payload
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_duration_ms": self.total_duration_ms,
+            "success": self.success,
+            "client_error": self.client_error,
+            "server_error": self.server_error,
+            "last_error": self.last_error,
+            "max_duration_ms": self.max_duration_ms,
+            "avg_duration_ms": self.total_duration_ms / self.count if self.count else 0.0,
+            "latency": self.latency.to_dict(time.time() if now is None else now),
+        }
 
 
 @dataclass
@@ -50,6 +224,7 @@ class OperationStats:
     total_duration_ms: float = 0.0
     last_error: Optional[str] = None
     last_metadata: Dict[str, Any] = field(default_factory=dict)
+    latency: LatencyStats = field(default_factory=LatencyStats)
 
     def register(
         self,
@@ -58,6 +233,7 @@ class OperationStats:
         success: bool,
         error: Optional[str],
         metadata: Optional[Dict[str, Any]],
+        now: Optional[float] = None,
     ) -> None:
         self.count += 1
         if success:
@@ -65,29 +241,120 @@ class OperationStats:
         else:
             self.failure += 1
         self.total_duration_ms += duration_ms
+        self.latency.register(duration_ms, time.time() if now is None else now)
         if error:
             self.last_error = error
         if metadata:
             self.last_metadata = dict(metadata)
 
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "success": self.success,
+            "failure": self.failure,
+            "total_duration_ms": self.total_duration_ms,
+            "last_error": self.last_error,
+            "last_metadata": dict(self.last_metadata),
+            "avg_duration_ms": self.total_duration_ms / self.count if self.count else 0.0,
+            "latency": self.latency.to_dict(time.time() if now is None else now),
+        }
+
+
+@dataclass
+class HistogramStats:
+    """Fixed-bucket histogram for one metric name and label set."""
+
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def register(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def copy(self) -> "HistogramStats":
+        return HistogramStats(self.buckets, list(self.counts), self.count, self.total)
+
     def to_dict(self) -> Dict[str, Any]:
-        payload = asdict(self)
-        payload["avg_duration_ms"] = self.total_duration_ms / self.count if self.count else 0.0
-        return payload
+        cumulative = 0
+        buckets: Dict[str, int] = {}
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": self.total, "buckets": buckets}
+
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+# Series recorded per endpoint table, operation table or histogram name; later
+# new keys are folded into one OVERFLOW_LABEL series so memory stays constant.
+MAX_SERIES = 200
+OVERFLOW_LABEL = "__other__"
+# Path recorded for requests that match no route (404s, requests rejected before routing).
+UNMATCHED_PATH = "__unmatched__"
+_HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Metric name prefix of the text exposition.
+OPENMETRICS_NAMESPACE = "tzona"
+# Series rendered per labelled family; the least used ones beyond it are summed into one
+# series whose label values are all OVERFLOW_LABEL.
+OPENMETRICS_MAX_SERIES = 100
+# A rendering is reused until something is recorded, and for at least this long regardless.
+OPENMETRICS_MIN_RENDER_SECONDS = 1.0
 
 
 class MetricsRecorder:
-    """Thread-safe metrics accumulator for FastAPI services."""
+    """Thread-safe metrics accumulator for FastAPI services.
+
+    Recording methods append the observation to a buffer owned by the calling
+    thread without taking the lock. A daemon thread merges the buffers under
+    the lock every ``flush_interval_seconds``, and so do snapshots and
+    renderings; a thread whose buffer reaches ``flush_every`` observations
+    merges it itself. Asyncio tasks share their loop thread's buffer.
+    ``flush_every=0`` applies every observation immediately under the lock.
+
+    Endpoints, operations and the label sets of each histogram are capped at
+    ``max_series``; once a table is full, new keys are recorded under
+    ``OVERFLOW_LABEL`` instead of growing it.
+    """
 
-    def __init__(self, service: str, *, environment: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        service: str,
+        *,
+        environment: Optional[str] = None,
+        max_series: int = MAX_SERIES,
+        flush_every: int = 16384,
+        flush_interval_seconds: float = 1.0,
+    ) -> None:
         self.service = service
         self.environment = environment or "unknown"
+        self.max_series = max_series
+        self.flush_every = flush_every
+        self.flush_interval_seconds = flush_interval_seconds
         self.started_at = time.time()
         self._lock = RLock()
         self._http_totals = RequestStats()
         self._http_endpoints: Dict[str, RequestStats] = {}
         self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
         self._operations: Dict[str, OperationStats] = {}
+        self._histograms: Dict[str, Dict[LabelSet, HistogramStats]] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        # Bumped on every write so the OpenMetrics rendering knows when it is stale.
+        self._version = 0
+        self._rendered: Optional[Tuple[int, float, str, frozenset]] = None
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, List[Tuple[Any, ...]]]] = []
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
 
     def observe_http_request(
         self,
@@ -98,15 +365,13 @@ class MetricsRecorder:
         duration_ms: float,
         error_message: Optional[str] = None,
     ) -> None:
-        key = f"{method.upper()} {path}"
-        with self._lock:
-            self._http_totals.register(status_code, duration_ms, error_message)
-            bucket = self._http_endpoints.setdefault(key, RequestStats())
-            bucket.register(status_code, duration_ms, error_message)
+        self._record((self._apply_http_request, method, path, status_code, duration_ms, error_message, time.time()))
 
     def increment_counter(self, name: str, value: float = 1.0) -> None:
-        with self._lock:
-            self._counters[name] = self._counters.get(name, 0.0) + value
+        self._record((self._apply_counter, name, value))
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._record((self._apply_gauge, name, float(value)))
 
     def observe_operation(
         self,
@@ -117,25 +382,456 @@ class MetricsRecorder:
         error: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
+        """Record one run of ``name``; ``metadata`` is kept as-is, so keep it free of per-user values."""
+        if metadata:
+            metadata = dict(metadata)
+        self._record((self._apply_operation, name, duration_ms, success, error, metadata, time.time()))
+
+    def observe_histogram(
+        self,
+        name: str,
+        value: float,
+        *,
+        labels: Optional[Dict[str, Any]] = None,
+        buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS_MS,
+    ) -> None:
+        """Record ``value`` in the histogram for ``name`` and the given labels."""
+        label_set: LabelSet = tuple(sorted((key, str(val)) for key, val in (labels or {}).items()))
+        self._record((self._apply_histogram, name, value, label_set, buckets))
+
+    def flush(self) -> None:
+        """Merge the observations buffered by every thread into the recorder."""
+        with self._lock:
+            for thread, buffer in list(self._shards):
+                # Owners only ever append, so the first ``pending`` items can be taken
+                # and removed while they keep recording.
+                pending = len(buffer)
+                if pending:
+                    events = buffer[:pending]
+                    del buffer[:pending]
+                    for event in events:
+                        event[0](*event[1:])
+                    self._version += 1
+                elif not thread.is_alive():
+                    self._shards.remove((thread, buffer))
+
+    def _record(self, event: Tuple[Any, ...]) -> None:
+        """Buffer ``event`` in the calling thread's shard without locking, merging every ``flush_every``."""
+        if self.flush_every <= 0:
+            with self._lock:
+                event[0](*event[1:])
+                self._version += 1
+            return
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._new_shard()
+        buffer.append(event)
+        if len(buffer) >= self.flush_every:
+            self.flush()
+
+    def _new_shard(self) -> List[Tuple[Any, ...]]:
+        buffer: List[Tuple[Any, ...]] = []
         with self._lock:
+            self._shards.append((threading.current_thread(), buffer))
+            if self._flusher is None and self.flush_interval_seconds > 0:
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically, name=f"metrics-flush-{self.service}", daemon=True
+                )
+                self._flusher.start()
+        self._local.buffer = buffer
+        return buffer
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self.flush_interval_seconds):
+            self.flush()
+
+    def close(self) -> None:
+        """Stop the periodic merge and merge what is still buffered."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _apply_http_request(
+        self, method: str, path: str, status_code: int, duration_ms: float, error_message: Optional[str], now: float
+    ) -> None:
+        method = method.upper()
+        key = f"{method if method in _HTTP_METHODS else 'OTHER'} {path}"
+        self._http_totals.register(status_code, duration_ms, error_message, now)
+        bucket = self._http_endpoints.get(key)
+        if bucket is None:
+            key = self._series_key(self._http_endpoints, key, f"{key.split(' ', 1)[0]} {OVERFLOW_LABEL}")
+            bucket = self._http_endpoints.setdefault(key, RequestStats())
+        bucket.register(status_code, duration_ms, error_message, now)
+
+    def _apply_counter(self, name: str, value: float) -> None:
+        self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def _apply_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def _apply_operation(
+        self,
+        name: str,
+        duration_ms: float,
+        success: bool,
+        error: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        now: float,
+    ) -> None:
+        bucket = self._operations.get(name)
+        if bucket is None:
+            name = self._series_key(self._operations, name, OVERFLOW_LABEL)
             bucket = self._operations.setdefault(name, OperationStats())
-            bucket.register(duration_ms=duration_ms, success=success, error=error, metadata=metadata)
+        bucket.register(duration_ms=duration_ms, success=success, error=error, metadata=metadata, now=now)
+
+    def _apply_histogram(self, name: str, value: float, label_set: LabelSet, buckets: Sequence[float]) -> None:
+        series = self._histograms.setdefault(name, {})
+        histogram = series.get(label_set)
+        if histogram is None:
+            label_set = self._series_key(series, label_set, tuple((key, OVERFLOW_LABEL) for key, _ in label_set))
+            histogram = series.get(label_set)
+            if histogram is None:
+                histogram = series[label_set] = HistogramStats(tuple(buckets))
+        histogram.register(value)
+
+    def _series_key(self, table: Dict[Any, Any], key: Any, overflow: Any) -> Any:
+        """``key`` while ``table`` has room for another series, ``overflow`` afterwards."""
+        return key if len(table) < self.max_series else overflow
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Any]]) -> None:
+        """Include ``collector()`` under ``collectors[name]`` in every snapshot."""
+        with self._lock:
+            self._collectors[name] = collector
 
     def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        self.flush()
         with self._lock:
-            return {
+            payload = {
                 "service": self.service,
                 "environment": self.environment,
-                "uptime_seconds": round(time.time() - self.started_at, 3),
-                "totals": self._http_totals.to_dict(),
-                "endpoints": {key: stats.to_dict() for key, stats in self._http_endpoints.items()},
+                "uptime_seconds": round(now - self.started_at, 3),
+                "totals": self._http_totals.to_dict(now),
+                "endpoints": {key: stats.to_dict(now) for key, stats in self._http_endpoints.items()},
                 "counters": dict(self._counters),
-                "operations": {key: stats.to_dict() for key, stats in self._operations.items()},
+                "gauges": dict(self._gauges),
+                "operations": {key: stats.to_dict(now) for key, stats in self._operations.items()},
+                "histograms": {
+                    name: [{"labels": dict(label_set), **stats.to_dict()} for label_set, stats in series.items()]
+                    for name, series in self._histograms.items()
+                },
             }
+            collectors = dict(self._collectors)
+        # Collectors keep their own state, so they run outside the recorder lock.
+        payload["collectors"] = {name: collector() for name, collector in collectors.items()}
+        return payload
+
+    def render_openmetrics(self) -> str:
+        """Render the recorded metrics in the OpenMetrics text format.
+
+        HTTP requests and operations become ``_total`` counters by outcome and
+        latency histograms over ``DEFAULT_DURATION_BUCKETS_MS``; counters,
+        gauges and ``observe_histogram`` series keep their names, prefixed with
+        ``OPENMETRICS_NAMESPACE``; numeric top-level fields of collectors are
+        exported as gauges. Only plain numbers are copied under the lock, and
+        the text is formatted outside of it.
+        """
+        started = time.monotonic()
+        body: Optional[str] = None
+        self.flush()
+        with self._lock:
+            rendered = self._rendered
+            if rendered is not None and (
+                rendered[0] == self._version or started - rendered[1] < OPENMETRICS_MIN_RENDER_SECONDS
+            ):
+                body, families = rendered[2], rendered[3]
+            else:
+                version = self._version
+                endpoints = [
+                    (*key.split(" ", 1), _request_outcomes(stats), stats.latency.lifetime.copy())
+                    for key, stats in self._http_endpoints.items()
+                ]
+                operations = [
+                    (name, {"success": stats.success, "failure": stats.failure}, stats.latency.lifetime.copy())
+                    for name, stats in self._operations.items()
+                ]
+                counters = dict(self._counters)
+                gauges = dict(self._gauges)
+                histograms = {
+                    name: [(label_set, stats.copy()) for label_set, stats in series.items()]
+                    for name, series in self._histograms.items()
+                }
+            collectors = dict(self._collectors)
+
+        if body is None:
+            lines: List[str] = []
+            families: Set[str] = set()
+            _render_families(lines, families, endpoints, operations, counters, gauges, histograms)
+            body = "".join(f"{line}\n" for line in lines)
+            families = frozenset(families)
+            with self._lock:
+                self._rendered = (version, started, body, families)
+        lines = []
+        _render_collectors(lines, set(families), collectors)
+        return body + "".join(f"{line}\n" for line in lines) + "# EOF\n"
+
+
+def _request_outcomes(stats: RequestStats) -> Dict[str, int]:
+    return {"success": stats.success, "client_error": stats.client_error, "server_error": stats.server_error}
+
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+# Highest sketch bin lying entirely below each duration bucket bound.
+_SKETCH_BUCKET_LIMITS: Tuple[int, ...] = tuple(
+    int(math.log(bound / LATENCY_MIN_MS) * _INV_LOG_GAMMA + 1e-9) for bound in DEFAULT_DURATION_BUCKETS_MS
+)
+
+_Series = TypeVar("_Series")
+
+
+def _metric_name(name: str) -> str:
+    return f"{OPENMETRICS_NAMESPACE}_{_INVALID_NAME_CHARS.sub('_', name)}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _labels(label_set: Iterable[Tuple[str, Any]]) -> str:
+    rendered = ",".join(
+        '{}="{}"'.format(
+            _INVALID_NAME_CHARS.sub("_", key),
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, value in label_set
+    )
+    return f"{{{rendered}}}" if rendered else ""
+
+
+def _bounded(
+    series: List[_Series], weight: Callable[[_Series], float], merge: Callable[[List[_Series]], _Series]
+) -> List[_Series]:
+    """Keep the ``OPENMETRICS_MAX_SERIES - 1`` heaviest series and merge the rest into one."""
+    if len(series) <= OPENMETRICS_MAX_SERIES:
+        return series
+    ranked = sorted(series, key=weight, reverse=True)
+    keep = OPENMETRICS_MAX_SERIES - 1
+    return ranked[:keep] + [merge(ranked[keep:])]
+
+
+def _merge_outcomes(series: List[Tuple[Any, ...]], label_count: int) -> Tuple[Any, ...]:
+    outcomes: Dict[str, int] = {}
+    latency = LatencyHistogram()
+    for item in series:
+        for outcome, value in item[label_count].items():
+            outcomes[outcome] = outcomes.get(outcome, 0) + value
+        latency.merge(item[label_count + 1])
+    return (*[OVERFLOW_LABEL] * label_count, outcomes, latency)
+
+
+def _merge_histograms(series: List[Tuple[LabelSet, HistogramStats]]) -> Tuple[LabelSet, HistogramStats]:
+    merged = series[0][1].copy()
+    for _, stats in series[1:]:
+        merged.counts = [left + right for left, right in zip(merged.counts, stats.counts)]
+        merged.count += stats.count
+        merged.total += stats.total
+    return tuple((key, OVERFLOW_LABEL) for key, _ in series[0][0]), merged
+
+
+def _family(lines: List[str], families: Set[str], metric: str, kind: str) -> bool:
+    """Open a metric family unless one with the same name was already rendered."""
+    if metric in families:
+        return False
+    families.add(metric)
+    lines.append(f"# TYPE {metric} {kind}")
+    return True
+
+
+def _bucket_lines(
+    lines: List[str], metric: str, label_set: LabelSet, cumulative: Iterable[Tuple[float, int]], count: int, total: float
+) -> None:
+    for bound, bucket_count in cumulative:
+        lines.append(f"{metric}_bucket{_labels((*label_set, ('le', _number(float(bound)))))} {bucket_count}")
+    lines.append(f"{metric}_bucket{_labels((*label_set, ('le', '+Inf')))} {count}")
+    lines.append(f"{metric}_count{_labels(label_set)} {count}")
+    lines.append(f"{metric}_sum{_labels(label_set)} {_number(total)}")
+
+
+def _sketch_buckets(sketch: LatencyHistogram) -> List[Tuple[float, int]]:
+    """Cumulative counts of a latency sketch over ``DEFAULT_DURATION_BUCKETS_MS``.
+
+    A sketch bin straddling a bound is counted in the next bucket, so bucket
+    counts are exact to within the sketch's ~5% bin width.
+    """
+    ordered = sorted(sketch.bins.items())
+    position = 0
+    cumulative = 0
+    buckets = []
+    for bound, limit in zip(DEFAULT_DURATION_BUCKETS_MS, _SKETCH_BUCKET_LIMITS):
+        while position < len(ordered) and ordered[position][0] <= limit:
+            cumulative += ordered[position][1]
+            position += 1
+        buckets.append((bound, cumulative))
+    return buckets
+
+
+def _histogram_buckets(stats: HistogramStats) -> List[Tuple[float, int]]:
+    cumulative = 0
+    buckets = []
+    for bound, bucket_count in zip(stats.buckets, stats.counts):
+        cumulative += bucket_count
+        buckets.append((bound, cumulative))
+    return buckets
+
+
+def _render_families(
+    lines: List[str],
+    families: Set[str],
+    endpoints: List[Tuple[str, str, Dict[str, int], LatencyHistogram]],
+    operations: List[Tuple[str, Dict[str, int], LatencyHistogram]],
+    counters: Dict[str, float],
+    gauges: Dict[str, float],
+    histograms: Dict[str, List[Tuple[LabelSet, HistogramStats]]],
+) -> None:
+    endpoints = _bounded(endpoints, lambda item: item[3].count, lambda rest: _merge_outcomes(rest, 2))
+    operations = _bounded(operations, lambda item: item[2].count, lambda rest: _merge_outcomes(rest, 1))
+    for family, label_names, series in (
+        ("http_request", ("method", "path"), endpoints),
+        ("operation", ("operation",), operations),
+    ):
+        if not series:
+            continue
+        requests = _metric_name(f"{family}s")
+        _family(lines, families, requests, "counter")
+        for item in series:
+            label_set = tuple(zip(label_names, item))
+            for outcome, value in item[len(label_names)].items():
+                lines.append(f"{requests}_total{_labels((*label_set, ('outcome', outcome)))} {value}")
+        durations = _metric_name(f"{family}_duration_ms")
+        _family(lines, families, durations, "histogram")
+        for item in series:
+            sketch = item[len(label_names) + 1]
+            label_set = tuple(zip(label_names, item))
+            _bucket_lines(lines, durations, label_set, _sketch_buckets(sketch), sketch.count, sketch.total)
+
+    for name, value in sorted(counters.items()):
+        metric = _metric_name(name)
+        if metric.endswith("_total"):
+            metric = metric[: -len("_total")]
+        if _family(lines, families, metric, "counter"):
+            lines.append(f"{metric}_total {_number(value)}")
+    for name, value in sorted(gauges.items()):
+        metric = _metric_name(name)
+        if _family(lines, families, metric, "gauge"):
+            lines.append(f"{metric} {_number(value)}")
+    for name, series in sorted(histograms.items()):
+        metric = _metric_name(name)
+        if not _family(lines, families, metric, "histogram"):
+            continue
+        for label_set, stats in _bounded(series, lambda item: item[1].count, _merge_histograms):
+            _bucket_lines(lines, metric, label_set, _histogram_buckets(stats), stats.count, stats.total)
+
+
+def _render_collectors(
+    lines: List[str], families: Set[str], collectors: Dict[str, Callable[[], Dict[str, Any]]]
+) -> None:
+    for name, collector in sorted(collectors.items()):
+        for field_name, value in collector().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = _metric_name(f"{name}.{field_name}")
+            if _family(lines, families, metric, "gauge"):
+                lines.append(f"{metric} {_number(value)}")
+
+
+def route_template(scope) -> str:
+    """Path template of the route serving ``scope`` (``/api/stats/{userId}``), not the raw path.
+
+    Routing stores the matched route in the scope; requests answered before
+    routing (rate limits, CORS preflights) are matched against the app's
+    routes here. Paths no route matches share ``UNMATCHED_PATH``.
+    """
+    route = scope.get("route")
+    router = getattr(scope.get("app"), "router", None)
+    table = _route_table(router) if router is not None else None
+    path = scope.get("path", "")
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    if route is not None:
+        # A route of an included router only knows its own router's prefix.
+        candidates = table.by_route.get(id(route), ()) if table is not None else ()
+        if len(candidates) == 1:
+            return candidates[0][1]
+        for path_regex, path_format in candidates:
+            if path_regex.match(path):
+                return path_format
+        return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_PATH)
+    if table is not None:
+        for path_regex, path_format in table.patterns:
+            if path_regex.match(path):
+                return path_format
+    return UNMATCHED_PATH
+
+
+@dataclass(slots=True)
+class _RouteTable:
+    """Full path patterns of an app's routes, in routing order and per route object."""
+
+    router: Any
+    size: int
+    patterns: List[Tuple[re.Pattern, str]] = field(default_factory=list)
+    by_route: Dict[int, List[Tuple[re.Pattern, str]]] = field(default_factory=dict)
+
+
+# Keyed by router id since routers are unhashable; an app keeps its router for its lifetime.
+_ROUTE_TABLES: Dict[int, _RouteTable] = {}
+
+
+def _route_table(router) -> _RouteTable:
+    routes = getattr(router, "routes", ())
+    table = _ROUTE_TABLES.get(id(router))
+    if table is not None and table.router is router and table.size == len(routes):
+        return table
+    table = _RouteTable(router, len(routes))
+    for route, path_regex, path_format in _flatten_routes(routes, ""):
+        table.patterns.append((path_regex, path_format))
+        table.by_route.setdefault(id(route), []).append((path_regex, path_format))
+    _ROUTE_TABLES[id(router)] = table
+    return table
+
+
+def _flatten_routes(routes, prefix: str) -> Iterable[Tuple[Any, re.Pattern, str]]:
+    """Yield every route with its full path pattern, descending into included routers.
+
+    FastAPI's ``include_router`` adds one entry per included router whose
+    ``matches`` never succeeds; its routes live on ``original_router`` under
+    the include prefix, so they are compiled here with that prefix applied.
+    """
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            context = getattr(route, "include_context", None)
+            yield from _flatten_routes(included.routes, prefix + getattr(context, "prefix", ""))
+            continue
+        path = getattr(route, "path", None)
+        if path is None:
+            continue
+        if isinstance(route, Mount):
+            path = path.rstrip("/") + "/{path:path}"
+        path_regex, path_format, _ = compile_path(prefix + path)
+        yield route, path_regex, path_format
 
 
 class MetricsMiddleware:
-    """FastAPI middleware that records request timings and statuses."""
+    """FastAPI middleware that records request timings and statuses per route template."""
 
     def __init__(self, app, recorder: MetricsRecorder):
         self.app = app
@@ -147,7 +843,6 @@ class MetricsMiddleware:
             return
 
         method = scope.get("method", "GET")
-        path = scope.get("path", "/")
         start = time.perf_counter()
         status_holder = {"value": 500}
 
@@ -162,7 +857,7 @@ class MetricsMiddleware:
             duration_ms = (time.perf_counter() - start) * 1000
             self.recorder.observe_http_request(
                 method=method,
-                path=path,
+                path=route_template(scope),
                 status_code=500,
                 duration_ms=duration_ms,
                 error_message=str(exc),
@@ -172,7 +867,7 @@ class MetricsMiddleware:
             duration_ms = (time.perf_counter() - start) * 1000
             self.recorder.observe_http_request(
                 method=method,
-                path=path,
+                path=route_template(scope),
                 status_code=status_holder["value"],
                 duration_ms=duration_ms,
             )
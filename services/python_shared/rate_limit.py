@@ -11,8 +11,8 @@ from typing import Iterable, Optional
 from fastapi import Request
 from fastapi.responses import JSONResponse
 from starlette import status
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 REQUEST_ID_HEADER = "X-Request-ID"
 
@@ -120,30 +120,37 @@ class RateLimiter:
             return RateLimitResult(limit=self._config.limit, remaining=remaining, reset_in=reset_in)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Starlette middleware that enforces the microservice rate limit."""
+class RateLimitMiddleware:
+    """Pure ASGI middleware that enforces the microservice rate limit."""
 
-    def __init__(self, app, *, limiter: RateLimiter, config: RateLimitConfig):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, *, limiter: RateLimiter, config: RateLimitConfig):
+        self.app = app
         self._limiter = limiter
         self._config = config
 
-    async def dispatch(self, request: Request, call_next):  # type: ignore[override]
-        if self._should_skip(request):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        key = self._key_for_request(request)
+        request = Request(scope)
+        key = "" if self._should_skip(request) else self._key_for_request(request)
         if not key:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         try:
             result = await self._limiter.hit(key)
         except RateLimitExceeded as exc:
-            return self._reject(request, exc)
+            await self._reject(request, exc)(scope, receive, send)
+            return
 
-        response = await call_next(request)
-        self._apply_headers(response, result)
-        return response
+        async def send_with_limits(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                self._apply_headers(MutableHeaders(scope=message), result)
+            await send(message)
+
+        await self.app(scope, receive, send_with_limits)
 
     def _should_skip(self, request: Request) -> bool:
         if request.method.upper() in self._config.safe_methods:
@@ -168,8 +175,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         response.headers["Retry-After"] = str(int(exc.retry_after))
         return response
 
-    def _apply_headers(self, response: Response, result: RateLimitResult) -> None:
-        response.headers[f"{self._config.header_prefix}-Limit"] = str(result.limit)
-        response.headers[f"{self._config.header_prefix}-Remaining"] = str(result.remaining)
-        response.headers[f"{self._config.header_prefix}-Reset"] = str(int(result.reset_in))
+    def _apply_headers(self, headers: MutableHeaders, result: RateLimitResult) -> None:
+        headers[f"{self._config.header_prefix}-Limit"] = str(result.limit)
+        headers[f"{self._config.header_prefix}-Remaining"] = str(result.remaining)
+        headers[f"{self._config.header_prefix}-Reset"] = str(int(result.reset_in))
 
@@ -0,0 +1,309 @@
+"""Redis-backed L2 tier for ``python_shared.cache.AsyncTTLCache``.
+
+Every replica keeps its own in-process L1 and shares one Redis L2, so a value
+loaded by one replica is a hit for the others. Keys are stored as
+``<namespace>:<key>``. ``delete`` and ``clear`` are broadcast on the
+``<namespace>:invalidate`` channel so peers drop their L1 copies too.
+
+``redis`` (``redis.asyncio``) is imported lazily; without it, or when Redis is
+unreachable, the cache keeps working on L1 alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+
+class Serializer(Protocol):
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, payload: bytes) -> Any: ...
+
+
+class JsonSerializer:
+    """Standard library JSON; values that JSON cannot represent (datetimes, UUIDs) become strings."""
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+
+class OrjsonSerializer:
+    """orjson: several times faster than ``json``, serialises datetimes and UUIDs natively."""
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, default=str, option=self._orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, payload: bytes) -> Any:
+        return self._orjson.loads(payload)
+
+
+class MsgpackSerializer:
+    """MessagePack: compact binary payloads."""
+
+    def __init__(self) -> None:
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=str, use_bin_type=True)
+
+    def loads(self, payload: bytes) -> Any:
+        return self._msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+SERIALIZERS: Dict[str, Callable[[], Serializer]] = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+def create_serializer(name: str, *, logger: Optional[logging.Logger] = None) -> Serializer:
+    """Build the serializer registered as ``name``, falling back to JSON if its package is missing."""
+    try:
+        factory = SERIALIZERS[name.strip().lower()]
+    except KeyError as exc:
+        raise ValueError(f"Unknown cache serializer '{name}', expected one of {sorted(SERIALIZERS)}") from exc
+    try:
+        return factory()
+    except ImportError as exc:
+        (logger or logging.getLogger("tzona.cache")).warning(
+            "cache.serializer_unavailable", extra={"serializer": name, "fallback": "json", "reason": str(exc)}
+        )
+        return JsonSerializer()
+
+
+_CLEAR_ALL = "*"
+
+
+class RedisCacheTier:
+    """Shared L2 tier with pub/sub invalidation.
+
+    Values are stored with their wall-clock soft expiry and a Redis expiry at
+    the hard TTL, so an entry read back from L2 keeps its remaining lifetime.
+    Redis errors are counted (``cache.<namespace>.l2_errors``), logged at most
+    once per ``error_log_seconds`` per operation, and reported to the caller as
+    misses. Socket timeouts bound how long an unreachable Redis can hold up a
+    lookup; the invalidation listener reconnects with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        namespace: str,
+        serializer: Optional[Serializer] = None,
+        logger: Optional[logging.Logger] = None,
+        metrics=None,
+        client=None,
+        reconnect_seconds: float = 5.0,
+        max_reconnect_seconds: float = 60.0,
+        socket_timeout_seconds: float = 0.5,
+        error_log_seconds: float = 30.0,
+    ) -> None:
+        self._url = url
+        self._namespace = namespace
+        self._serializer = serializer or JsonSerializer()
+        self._logger = logger or logging.getLogger(f"tzona.cache.{namespace}")
+        self._metrics = metrics
+        self._client = client
+        self._reconnect_seconds = reconnect_seconds
+        self._max_reconnect_seconds = max(reconnect_seconds, max_reconnect_seconds)
+        self._socket_timeout_seconds = socket_timeout_seconds
+        self._error_log_seconds = error_log_seconds
+        # operation -> (monotonic time of the last logged error, errors suppressed since)
+        self._error_log: Dict[str, Tuple[float, int]] = {}
+        self._channel = f"{namespace}:invalidate"
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task[None]] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    async def connect(self, on_invalidate: Callable[[Optional[str]], None]) -> bool:
+        """Connect and start listening for peer invalidations; ``False`` when Redis is unavailable."""
+        if self._client is None:
+            try:
+                from redis import asyncio as redis_asyncio
+            except ImportError:
+                self._logger.warning("cache.l2_disabled", extra={"reason": "redis package is not installed"})
+                return False
+            self._client = redis_asyncio.from_url(
+                self._url,
+                socket_connect_timeout=self._socket_timeout_seconds,
+                socket_timeout=self._socket_timeout_seconds,
+            )
+        if self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen(on_invalidate))
+        return True
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            close = getattr(self._client, "aclose", None) or self._client.close
+            await close()
+            self._client = None
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Return ``(value, seconds_until_stale, ttl_seconds)``; the second is negative once stale."""
+        if self._client is None:
+            return None
+        try:
+            payload = await self._client.get(self._key(key))
+            if payload is None:
+                return None
+            return self._unpack(payload)
+        except Exception:
+            self._record_error("get")
+            return None
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[Tuple[Any, float, float]]]:
+        """``get`` for several keys with a single MGET; results follow the order of ``keys``."""
+        if self._client is None or not keys:
+            return [None] * len(keys)
+        try:
+            payloads = await self._client.mget([self._key(key) for key in keys])
+        except Exception:
+            self._record_error("get_many")
+            return [None] * len(keys)
+        results: List[Optional[Tuple[Any, float, float]]] = []
+        for payload in payloads:
+            try:
+                results.append(None if payload is None else self._unpack(payload))
+            except Exception:
+                self._record_error("get_many")
+                results.append(None)
+        return results
+
+    async def set(self, key: str, value: Any, *, ttl_seconds: float, stale_ttl_seconds: float) -> None:
+        if self._client is None:
+            return
+        try:
+            await self._client.set(
+                self._key(key),
+                self._pack(value, ttl_seconds),
+                px=max(1, math.ceil((ttl_seconds + stale_ttl_seconds) * 1000)),
+            )
+        except Exception:
+            self._record_error("set")
+
+    async def set_many(
+        self, items: Mapping[str, Any], *, ttl_seconds: float, stale_ttl_seconds: float
+    ) -> None:
+        """``set`` for several keys in one non-transactional pipeline round trip."""
+        if self._client is None or not items:
+            return
+        px = max(1, math.ceil((ttl_seconds + stale_ttl_seconds) * 1000))
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self._key(key), self._pack(value, ttl_seconds), px=px)
+                await pipe.execute()
+        except Exception:
+            self._record_error("set_many")
+
+    async def delete(self, key: str) -> None:
+        if self._client is None:
+            return
+        try:
+            await self._client.delete(self._key(key))
+            await self._client.publish(self._channel, f"{self._origin}|{key}")
+        except Exception:
+            self._record_error("delete")
+
+    async def clear(self) -> None:
+        """Remove every key of the namespace and tell peers to clear their L1."""
+        if self._client is None:
+            return
+        try:
+            batch = []
+            async for redis_key in self._client.scan_iter(match=f"{self._namespace}:*", count=500):
+                batch.append(redis_key)
+                if len(batch) >= 500:
+                    await self._client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await self._client.unlink(*batch)
+            await self._client.publish(self._channel, f"{self._origin}|{_CLEAR_ALL}")
+        except Exception:
+            self._record_error("clear")
+
+    def _key(self, key: str) -> str:
+        return f"{self._namespace}:{key}"
+
+    def _pack(self, value: Any, ttl_seconds: float) -> bytes:
+        return self._serializer.dumps({"value": value, "staleAt": time.time() + ttl_seconds, "ttl": ttl_seconds})
+
+    def _unpack(self, payload: bytes) -> Tuple[Any, float, float]:
+        envelope = self._serializer.loads(payload)
+        fresh_seconds = envelope["staleAt"] - time.time()
+        return envelope["value"], fresh_seconds, envelope.get("ttl", fresh_seconds)
+
+    async def _listen(self, on_invalidate: Callable[[Optional[str]], None]) -> None:
+        """Apply peer invalidations to L1, resubscribing after connection errors."""
+        subscribed = True
+        delay = self._reconnect_seconds
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                subscribed = True
+                delay = self._reconnect_seconds
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    origin, _, key = (data.decode() if isinstance(data, bytes) else data).partition("|")
+                    if origin != self._origin:
+                        on_invalidate(None if key == _CLEAR_ALL else key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._record_error("subscribe")
+                if subscribed:
+                    # Invalidations may have been missed; drop L1 once per disconnect,
+                    # not on every failed attempt, so an outage does not stampede loaders.
+                    on_invalidate(None)
+                    subscribed = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_seconds)
+            finally:
+                try:
+                    await (getattr(pubsub, "aclose", None) or pubsub.close)()
+                except Exception:
+                    pass
+
+    def _record_error(self, operation: str) -> None:
+        if self._metrics:
+            self._metrics.increment_counter(f"cache.{self._namespace}.l2_errors")
+        now = time.monotonic()
+        logged_at, suppressed = self._error_log.get(operation, (-math.inf, 0))
+        if now - logged_at < self._error_log_seconds:
+            self._error_log[operation] = (logged_at, suppressed + 1)
+            return
+        self._error_log[operation] = (now, 0)
+        self._logger.warning(
+            "cache.l2_error", extra={"operation": operation, "suppressed": suppressed}, exc_info=True
+        )
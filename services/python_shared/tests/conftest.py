@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Make ``python_shared`` importable the way the services do.
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+if str(SERVICES_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVICES_DIR))
@@ -0,0 +1,112 @@
+"""In-memory stand-in for the parts of ``redis.asyncio`` that ``RedisCacheTier`` uses."""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeRedis:
+    """Key/value store with PX expiry and pub/sub fan-out to every subscriber."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Tuple[bytes, float]] = {}
+        self.subscribers: List["FakePubSub"] = []
+        self.round_trips = 0
+
+    def _read(self, key: str) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return item[0]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.round_trips += 1
+        return self._read(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        self.round_trips += 1
+        return [self._read(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, px: int) -> None:
+        self.round_trips += 1
+        self.data[key] = (value, time.monotonic() + px / 1000)
+
+    async def delete(self, key: str) -> None:
+        self.round_trips += 1
+        self.data.pop(key, None)
+
+    async def unlink(self, *keys: str) -> None:
+        self.round_trips += 1
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match: str, count: int):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def publish(self, channel: str, message: str) -> None:
+        self.round_trips += 1
+        for subscriber in self.subscribers:
+            if channel in subscriber.channels:
+                subscriber.queue.put_nowait({"type": "message", "data": message.encode()})
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def pubsub(self) -> "FakePubSub":
+        return FakePubSub(self)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakePipeline:
+    """Buffers ``set`` calls and applies them in one round trip on ``execute``."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self._commands: List[Tuple[str, bytes, int]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._commands.clear()
+
+    def set(self, key: str, value: bytes, px: int) -> "FakePipeline":
+        self._commands.append((key, value, px))
+        return self
+
+    async def execute(self) -> List[bool]:
+        self._redis.round_trips += 1
+        for key, value, px in self._commands:
+            self._redis.data[key] = (value, time.monotonic() + px / 1000)
+        results = [True] * len(self._commands)
+        self._commands.clear()
+        return results
+
+
+class FakePubSub:
+    def __init__(self, redis: FakeRedis) -> None:
+        self._redis = redis
+        self.channels: set[str] = set()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+        self._redis.subscribers.append(self)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self) -> None:
+        if self in self._redis.subscribers:
+            self._redis.subscribers.remove(self)
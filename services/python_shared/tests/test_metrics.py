@@ -0,0 +1,98 @@
+"""Route-template resolution used to label HTTP metrics."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+from starlette.routing import Mount
+
+from python_shared.metrics import UNMATCHED_PATH, MetricsMiddleware, MetricsRecorder, route_template
+from python_shared.rate_limit import RateLimitConfig, RateLimitMiddleware, RateLimiter
+
+
+def _scope(app: FastAPI, path: str, method: str = "GET") -> dict:
+    return {"type": "http", "app": app, "method": method, "path": path, "root_path": ""}
+
+
+def _nested_app() -> tuple[FastAPI, APIRouter]:
+    """``/api/stats/{userId}`` via two nested includes, the same router again under ``/v2``."""
+    stats = APIRouter(prefix="/stats")
+
+    @stats.post("/{userId}")
+    async def post_stats(userId: str) -> dict:
+        return {"userId": userId}
+
+    api = APIRouter(prefix="/api")
+    api.include_router(stats)
+
+    @api.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    app = FastAPI()
+    app.include_router(api)
+    app.include_router(stats, prefix="/v2")
+    return app, stats
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/api/stats/42", "/api/stats/{userId}"),
+        ("/v2/stats/42", "/v2/stats/{userId}"),
+        ("/api/health", "/api/health"),
+        ("/missing", UNMATCHED_PATH),
+    ],
+)
+def test_unrouted_requests_resolve_through_nested_include_router(path, expected):
+    app, _ = _nested_app()
+    assert route_template(_scope(app, path)) == expected
+
+
+def test_routed_request_gets_the_full_prefix_of_its_include():
+    app, stats = _nested_app()
+    route = stats.routes[0]
+    # The route only knows its own router's prefix, and the same route object is included under /api and /v2; the path picks the prefix.
+    assert route_template({**_scope(app, "/api/stats/1"), "route": route}) == "/api/stats/{userId}"
+    assert route_template({**_scope(app, "/v2/stats/1"), "route": route}) == "/v2/stats/{userId}"
+
+
+def test_mounted_apps_resolve_to_the_mount_template():
+    app = FastAPI()
+    app.router.routes.append(Mount("/static", app=FastAPI()))
+    assert route_template(_scope(app, "/static/css/site.css")) == "/static/{path}"
+
+
+def test_root_path_is_stripped_before_matching():
+    app, _ = _nested_app()
+    scope = {**_scope(app, "/gateway/api/health"), "root_path": "/gateway"}
+    assert route_template(scope) == "/api/health"
+
+
+def test_rate_limited_and_preflight_requests_are_recorded_by_template():
+    app, _ = _nested_app()
+    recorder = MetricsRecorder("route-check")
+    config = RateLimitConfig(limit=2, window_seconds=60)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(config), config=config)
+    app.add_middleware(MetricsMiddleware, recorder=recorder)
+    client = TestClient(app)
+
+    preflight = client.options(
+        "/api/stats/user-1",
+        headers={"Origin": "http://example.com", "Access-Control-Request-Method": "POST"},
+    )
+    statuses = [client.post(f"/api/stats/user-{index}").status_code for index in range(5)]
+    client.get("/missing")
+    recorder.flush()
+
+    assert preflight.status_code == 200
+    assert 429 in statuses
+    endpoints = {key: value["count"] for key, value in recorder.snapshot()["endpoints"].items()}
+    assert endpoints == {
+        "OPTIONS /api/stats/{userId}": 1,
+        "POST /api/stats/{userId}": 5,
+        f"GET {UNMATCHED_PATH}": 1,
+    }
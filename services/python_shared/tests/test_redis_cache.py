@@ -0,0 +1,155 @@
+"""Two cache instances sharing one (fake) Redis L2, as two service replicas would."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from python_shared.cache import AsyncTTLCache, CacheConfig
+from python_shared.redis_cache import JsonSerializer, RedisCacheTier, create_serializer
+
+from fake_redis import FakeRedis
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def replicas():
+    redis = FakeRedis()
+    config = CacheConfig(namespace="analytics", stale_ttl_seconds=5)
+    caches = [
+        AsyncTTLCache(config, l2=RedisCacheTier("redis://fake", namespace="analytics", client=redis))
+        for _ in range(2)
+    ]
+    for cache in caches:
+        await cache.start()
+    await asyncio.sleep(0)
+    yield redis, caches
+    for cache in caches:
+        await cache.close()
+
+
+async def _settle() -> None:
+    # Let the listeners apply published invalidations.
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_value_loaded_by_one_replica_is_an_l2_hit_for_the_other(replicas):
+    _, (first, second) = replicas
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return {"total": calls}
+
+    assert await first.remember("aggregate:platform", load, ttl_seconds=10) == {"total": 1}
+    assert await second.remember("aggregate:platform", load, ttl_seconds=10) == {"total": 1}
+    assert calls == 1
+    assert second.stats()["l2_hits"] == 1
+    # The L2 copy is now in the second replica's L1 with the configured TTL.
+    assert len(second) == 1
+    assert second._entries["aggregate:platform"].ttl == 10
+
+
+async def test_delete_is_broadcast_to_peer_l1(replicas):
+    redis, (first, second) = replicas
+    await first.set("stats:profile:1", {"sessions": 3})
+    assert await second.get("stats:profile:1") == {"sessions": 3}
+
+    await first.delete("stats:profile:1")
+    await _settle()
+
+    assert len(second) == 0
+    assert "analytics:stats:profile:1" not in redis.data
+    assert await second.get("stats:profile:1") is None
+
+
+async def test_clear_is_broadcast_to_peer_l1(replicas):
+    redis, (first, second) = replicas
+    await first.set("a", 1)
+    await second.set("b", 2)
+
+    await first.clear()
+    await _settle()
+
+    assert len(first) == 0 and len(second) == 0
+    assert redis.data == {}
+
+
+async def test_replica_ignores_its_own_invalidations(replicas):
+    _, (first, second) = replicas
+    await first.set("a", 1)
+    await first.delete("a")
+    await first.set("a", 2)
+    await _settle()
+
+    # The broadcast of its own delete must not drop the value it stored since.
+    assert "a" in first._entries
+    assert "a" not in second._entries
+
+
+async def test_unreachable_redis_degrades_to_l1():
+    class BrokenRedis(FakeRedis):
+        async def get(self, key):
+            raise ConnectionError("down")
+
+    logger = logging.getLogger("test.cache.broken")
+    cache = AsyncTTLCache(
+        CacheConfig(namespace="analytics"),
+        l2=RedisCacheTier("redis://fake", namespace="analytics", client=BrokenRedis(), logger=logger),
+    )
+
+    async def load():
+        return "fresh"
+
+    assert await cache.remember("k", load) == "fresh"
+    assert await cache.remember("k", load) == "fresh"
+
+
+def test_missing_serializer_package_falls_back_to_json(monkeypatch, caplog):
+    import builtins
+
+    real_import = builtins.__import__
+
+    def without_msgpack(name, *args, **kwargs):
+        if name == "msgpack":
+            raise ImportError("No module named 'msgpack'")
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", without_msgpack)
+    with caplog.at_level(logging.WARNING):
+        serializer = create_serializer("msgpack")
+    assert isinstance(serializer, JsonSerializer)
+    assert "cache.serializer_unavailable" in caplog.text
+
+
+def test_unknown_serializer_is_rejected():
+    with pytest.raises(ValueError):
+        create_serializer("pickle")
+
+
+async def test_batched_lookups_and_writes_take_one_round_trip_each(replicas):
+    redis, (first, second) = replicas
+    keys = [f"stats:profile:{index}" for index in range(10)]
+    await first.set_many({key: {"n": index} for index, key in enumerate(keys[:5])}, ttl_seconds=30)
+
+    redis.round_trips = 0
+    found = await second.get_many(keys)
+
+    assert redis.round_trips == 1
+    assert found == {key: {"n": index} for index, key in enumerate(keys[:5])}
+    stats = second.stats()
+    assert stats["l2_hits"] == 5 and stats["misses"] == 5
+
+    redis.round_trips = 0
+    assert await second.get_many(keys[:5]) == found
+    assert redis.round_trips == 0
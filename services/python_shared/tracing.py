@@ -1,11 +1,10 @@
 """Simple trace context propagation for FastAPI services."""
 
 import uuid
-from typing import Callable
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 TRACE_HEADER = "x-trace-id"
 
@@ -16,17 +15,31 @@ def _coerce_trace_id(value: str | None) -> str:
     return uuid.uuid4().hex
 
 
-class TraceMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, header_name: str = TRACE_HEADER):
-        super().__init__(app)
+class TraceMiddleware:
+    """Pure ASGI middleware that propagates the trace id and echoes it on the response.
+
+    The id is stored in ``scope["state"]``, which is what ``request.state`` reads.
+    """
+
+    def __init__(self, app: ASGIApp, header_name: str = TRACE_HEADER):
+        self.app = app
         self.header_name = header_name
 
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:  # type: ignore[override]
-        trace_id = _coerce_trace_id(request.headers.get(self.header_name) or request.headers.get("traceparent"))
-        request.state.trace_id = trace_id
-        response = await call_next(request)
-        response.headers[self.header_name] = trace_id
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        trace_id = _coerce_trace_id(headers.get(self.header_name) or headers.get("traceparent"))
+        scope.setdefault("state", {})["trace_id"] = trace_id
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[self.header_name] = trace_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_trace)
 
 
 def get_trace_id(request: Request) -> str: